@@ -52,7 +52,9 @@ SYSTEM_PROMPT_FILE = CONFIG_DIR / "system_prompt.txt"
 
 # 记忆数据库 (Memory)
 MEMORY_FILE = DATA_DIR / "memory.json"
-LONG_TERM_MEMORY_FILE = DATA_DIR / "long_term_memory.json"
+LONG_TERM_MEMORY_DB = DATA_DIR / "long_term_memory.db"            # SQLite 长期记忆库
+LONG_TERM_MEMORY_FILE = DATA_DIR / "long_term_memory.json"        # 旧版整体 JSON（只读，迁移用）
+LONG_TERM_MEMORY_LOG = DATA_DIR / "long_term_memory.jsonl"        # 旧版追加日志（只读，迁移用）
 
 # 桌面路径 (用于导出笔记)
 DESKTOP_PATH = Path.home() / "Desktop"
@@ -176,6 +176,9 @@ class BaseSkillMixin:
         self._vision_history_dir = self.config.PROJECT_ROOT / "data" / "vision_history"
         self._vision_history_dir.mkdir(exist_ok=True)
         
+        # [视觉] YOLO-World 当前的检测类别（描述不变时不再重新编码文本提示）
+        self._yolo_classes = None
+
         # [视觉] 初始化 YOLO-World 模型（零样本目标检测）
         if YOLOWORLD_AVAILABLE:
             try:
@@ -499,7 +499,10 @@ class GUISkills:
             return f"❌ 未找到 '{description}'。YOLO-World 模型未加载且 UIA 未匹配到控件。"
 
         try:
-            self.yolo_world.set_classes([description])
+            # set_classes 要跑一遍 CLIP 文本编码器，同一描述重复查找时跳过
+            if self._yolo_classes != [description]:
+                self.yolo_world.set_classes([description])
+                self._yolo_classes = [description]
             screenshot_array = np.array(pyautogui.screenshot())
             results = self.yolo_world.predict(screenshot_array, conf=0.1, verbose=False)
             if len(results[0].boxes) > 0:
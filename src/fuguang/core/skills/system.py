@@ -2,7 +2,7 @@
 SystemSkills — 🐚 系统命令类技能
 Shell 执行、文件操作、应用启动、音量控制、提醒、笔记、代码生成/执行
 """
-import subprocess, os, time, datetime, logging, json
+import subprocess, os, re, time, datetime, logging, json, functools, locale, codecs
 import psutil, keyboard
 
 from .base import WHISPER_AVAILABLE
@@ -26,6 +26,55 @@ _SYSTEM_TOOLS_SCHEMA = [
 ]
 
 
+# Shell 黑名单（不区分大小写的子串匹配）：导入时编译成一个正则，一次扫描完成
+_SHELL_FORBIDDEN = ["format ", "mkfs", "dd if=", "> /dev/sda", "clear-disk", "format-volume", "shutdown", "restart", "reboot", "poweroff", "reg delete hklm", "reg delete hkcr", ":(){ :|:& };:", "%0|%0", "c:\\windows", "c:\\program files", "system32"]
+# 删除类命令 + 系统关键目录 同时出现时拦截
+_SHELL_DELETE_KW = ["remove-item", "del ", "rm ", "rd ", "rmdir", "rm -r", "rm -f"]
+_SHELL_PROTECTED_DIRS = ["c:\\windows", "c:\\program files", "c:\\program files (x86)", "system32", "syswow64", "$env:windir", "$env:systemroot", "\\appdata\\roaming\\microsoft", "/etc", "/usr", "/bin", "/sbin", "/boot", "/var"]
+
+
+def _compile_substrings(patterns):
+    """一组子串 → 一个不区分大小写的正则"""
+    return re.compile("|".join(map(re.escape, patterns)), re.IGNORECASE)
+
+
+_SHELL_FORBIDDEN_RE = _compile_substrings(_SHELL_FORBIDDEN)
+_SHELL_DELETE_RE = _compile_substrings(_SHELL_DELETE_KW)
+_SHELL_PROTECTED_RE = _compile_substrings(_SHELL_PROTECTED_DIRS)
+
+# 控制台输出的本地编码（中文 Windows 上是 cp936/GBK），导入时取一次
+_SYS_ENCODING = locale.getpreferredencoding(False) or "utf-8"
+
+
+def _decode_output(data: bytes, limit: int):
+    """解码命令输出：先按 UTF-8 严格解码，不是 UTF-8 再按系统编码解码
+
+    只解码最终会显示的前 limit 个字符对应的字节（每字符最多 4 字节，多留一个字符用于判断是否截断），
+    大段输出（如 pip 日志）不再整段解码后丢弃。
+    Returns (去掉首尾空白、最多 limit 个字符的文本, 是否被截断)
+    """
+    data = data.strip()
+    head = data[:(limit + 1) * 4]
+    complete = len(head) == len(data)
+    try:
+        # 增量解码器会把截在半个字符处的尾部字节留着不报错
+        text = codecs.getincrementaldecoder("utf-8")().decode(head, final=complete)
+    except UnicodeDecodeError:
+        text = head.decode(_SYS_ENCODING, errors="replace")
+    text = text.strip()
+    truncated = len(text) > limit
+    if truncated:
+        text = text[:limit].rstrip()
+    return text, truncated
+
+
+@functools.lru_cache(maxsize=1)
+def _get_whisper(name: str = "small"):
+    """Whisper 模型单例（约 460MB，进程内只加载一次，多个实例共享）"""
+    import whisper
+    return whisper.load_model(name)
+
+
 class SystemSkills:
     """系统命令类技能 Mixin"""
     _SYSTEM_TOOLS = _SYSTEM_TOOLS_SCHEMA
@@ -350,8 +399,7 @@ class SystemSkills:
         if not path.is_absolute(): path = self.config.PROJECT_ROOT / file_path
         if not path.exists(): return f"❌ 找不到文件: {file_path}"
         try:
-            if self.whisper_model is None:
-                import whisper; self.whisper_model = whisper.load_model("small")
+            if self.whisper_model is None: self.whisper_model = _get_whisper("small")
             result = self.whisper_model.transcribe(str(path), fp16=True)
             text = result["text"].strip(); lang = result.get("language", "unknown")
             if not text: return "⚠️ 文件中没有检测到语音内容"
@@ -362,6 +410,7 @@ class SystemSkills:
 
     def listen_to_system_audio(self, duration: int = 30) -> str:
         import soundcard as sc, soundfile as sf, tempfile
+        import numpy as np
         # [修复] 限制最大录制时长，防止内存占用过大
         if duration > 120:
             return "❌ 录制时长过长，请设置 120 秒以内"
@@ -374,13 +423,19 @@ class SystemSkills:
             if not speaker:
                 return "❌ 未检测到默认扬声器，请检查音频设备"
             loopback = sc.get_microphone(id=str(speaker.id), include_loopback=True)
-            SR = 44100
-            with loopback.recorder(samplerate=SR) as mic: data = mic.record(numframes=SR * duration)
+            SR = 44100; BLOCK = 4096; total = SR * duration
+            # 分块录制进预分配的 float32 缓冲区（通道数由第一块决定），不再一次性分配整段大数组
+            with loopback.recorder(samplerate=SR, blocksize=BLOCK) as mic:
+                first = mic.record(numframes=min(BLOCK, total))
+                data = np.empty((total, first.shape[1]), dtype=np.float32)
+                data[:len(first)] = first; pos = len(first)
+                while pos < total:
+                    n = min(BLOCK, total - pos)
+                    data[pos:pos + n] = mic.record(numframes=n); pos += n
             with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp: temp_path = tmp.name
-            sf.write(temp_path, data, SR)
+            sf.write(temp_path, data, SR, subtype='PCM_16')  # 16-bit 足够 Whisper 使用，文件体积减半
             if not WHISPER_AVAILABLE: os.remove(temp_path); return "❌ Whisper 未安装"
-            if self.whisper_model is None:
-                import whisper; self.whisper_model = whisper.load_model("small")
+            if self.whisper_model is None: self.whisper_model = _get_whisper("small")
             result = self.whisper_model.transcribe(temp_path, fp16=True)
             os.remove(temp_path)
             text = result["text"].strip(); lang = result.get("language", "unknown")
@@ -479,27 +534,18 @@ class SystemSkills:
 
     def execute_shell_command(self, command: str, timeout: int = 60) -> str:
         logger.info(f"⚡ [Shell] AI 申请执行: {command}")
-        command_lower = command.lower()
-        forbidden = ["format ", "mkfs", "dd if=", "> /dev/sda", "clear-disk", "format-volume", "shutdown", "restart", "reboot", "poweroff", "reg delete hklm", "reg delete hkcr", ":(){ :|:& };:", "%0|%0", "c:\\windows", "c:\\program files", "system32"]
-        for p in forbidden:
-            if p.lower() in command_lower:
-                return f"❌ [安全拦截] 命令包含高危操作 '{p}'，已拒绝执行。"
-        delete_kw = ["remove-item", "del ", "rm ", "rd ", "rmdir", "rm -r", "rm -f"]
-        if any(kw in command_lower for kw in delete_kw):
-            danger = ["c:\\windows", "c:\\program files", "c:\\program files (x86)", "system32", "syswow64", "$env:windir", "$env:systemroot", "\\appdata\\roaming\\microsoft", "/etc", "/usr", "/bin", "/sbin", "/boot", "/var"]
-            if any(dp in command_lower for dp in danger):
-                return "❌ [安全拦截] 禁止删除系统关键目录！"
+        m = _SHELL_FORBIDDEN_RE.search(command)
+        if m:
+            return f"❌ [安全拦截] 命令包含高危操作 '{m.group(0).lower()}'，已拒绝执行。"
+        if _SHELL_DELETE_RE.search(command) and _SHELL_PROTECTED_RE.search(command):
+            return "❌ [安全拦截] 禁止删除系统关键目录！"
         try:
             result = subprocess.run(["powershell", "-Command", command], capture_output=True, timeout=timeout, cwd=str(self.config.PROJECT_ROOT))
-            try:
-                stdout = result.stdout.decode('utf-8', errors='ignore').strip()
-                stderr = result.stderr.decode('utf-8', errors='ignore').strip()
-            except:
-                stdout = result.stdout.decode('gbk', errors='ignore').strip()
-                stderr = result.stderr.decode('gbk', errors='ignore').strip()
+            stdout, stdout_cut = _decode_output(result.stdout, 2000)
+            stderr, stderr_cut = _decode_output(result.stderr, 1000)
             parts = []
-            if stdout: parts.append(f"【标准输出】:\n{stdout[:2000]}{'...(已截断)' if len(stdout)>2000 else ''}")
-            if stderr: parts.append(f"【错误信息】:\n{stderr[:1000]}{'...(已截断)' if len(stderr)>1000 else ''}")
+            if stdout: parts.append(f"【标准输出】:\n{stdout}{'...(已截断)' if stdout_cut else ''}")
+            if stderr: parts.append(f"【错误信息】:\n{stderr}{'...(已截断)' if stderr_cut else ''}")
             out = "\n\n".join(parts)
             if result.returncode == 0:
                 return f"✅ 命令执行成功 (返回码: 0)\n\n{out}" if out else "✅ 命令执行成功，无文本输出。"
@@ -39,7 +39,7 @@ try:
     from PyQt6.QtWidgets import QApplication
     from PyQt6.QtCore import QThread, pyqtSignal, Qt, QTimer
     from PyQt6.QtGui import QColor
-    from fuguang.gui.ball import FloatingBall, FuguangSignals, BallState
+    from fuguang.gui.ball import FloatingBall, FuguangSignals, BallState, prewarm_webengine
     from fuguang.gui.hud import HolographicHUD
     HAS_PYQT = True
 except ImportError:
@@ -260,6 +260,9 @@ class FuguangApp:
         self.app = QApplication(sys.argv)
         self.app.setQuitOnLastWindowClosed(False)
         
+        # 预热 WebEngine 渲染进程（与下面的 UI/工作线程初始化并行启动）
+        prewarm_webengine()
+        
         # 创建信号中心
         self.signals = FuguangSignals()
         
@@ -274,7 +277,7 @@ class FuguangApp:
         
         # 连接工作线程信号到 UI
         self.worker.state_changed.connect(self.ball.set_state)
-        self.worker.expression_changed.connect(self.ball.set_expression)  # [新增] AI 表情 → Emoji
+        self.worker.expression_changed.connect(self.ball.queue_expression)  # [新增] AI 表情 → Emoji（合并突发）
         self.worker.subtitle_update.connect(self._on_subtitle_update)
         self.worker.subtitle_long.connect(self._on_subtitle_long)
         self.worker.file_ingested.connect(self._on_file_ingested)
@@ -284,10 +287,7 @@ class FuguangApp:
         self.ball.drag_enter_handler = self._on_drag_enter
         self.ball.drop_handler = self._on_drop
         
-        # HUD 位置跟随定时器（100ms 刷新）
-        self.position_timer = QTimer()
-        self.position_timer.timeout.connect(self._update_hud_position)
-        self.position_timer.start(100)
+        # HUD 位置跟随定时器由 HUD 自己管理（仅可见时运行）
         
         # 拖拽时实时跟随（比定时器更流畅）
         self.signals.ball_moved.connect(self._update_hud_position)
@@ -325,8 +325,8 @@ class FuguangApp:
         self.hud.show_chat_history(messages)
 
     def _update_hud_position(self):
-        """HUD 位置跟随悬浮球"""
-        self.hud.update_position()
+        """HUD 位置跟随悬浮球（ball_moved 已由悬浮球按帧合并，这里直接定位，不再多等一帧）"""
+        self.hud.update_position(immediate=True)
 
     def _on_drag_enter(self, event):
         """拖拽进入"""
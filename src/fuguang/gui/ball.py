@@ -12,7 +12,7 @@
 技术架构：
     QWebEngineView 内嵌 lottie_player.html
     → dotlottie-player 组件渲染 Lottie JSON
-    → CSS transform scaleY() 做压扁/弹开过渡
+    → CSS transform scale3d() 做压扁/弹开过渡
     → Python 通过 runJavaScript() 调用 JS 切换表情
 
 新增表情：
@@ -36,18 +36,25 @@ logger = logging.getLogger("Fuguang")
 try:
     from PyQt6.QtWidgets import QApplication, QWidget, QMenu, QLabel
     from PyQt6.QtCore import (
-        Qt, QPoint, QTimer, pyqtSignal, QObject, QSize, QUrl
+        Qt, QPoint, QTimer, pyqtSignal, QObject, QSize, QUrl,
+        QFileSystemWatcher
     )
-    from PyQt6.QtGui import QPainter, QColor, QAction
+    from PyQt6.QtGui import QPainter, QColor, QAction, QImageReader, QPixmap
     PYQT_AVAILABLE = True
 except ImportError:
     PYQT_AVAILABLE = False
     logger.warning("⚠️ PyQt6 未安装，GUI 功能将受限")
 
+# Chromium 启动参数（必须在 WebEngine 初始化前设置；已有环境变量时不覆盖）
+os.environ.setdefault(
+    "QTWEBENGINE_CHROMIUM_FLAGS",
+    "--disable-gpu-watchdog --disable-features=Translate,CalculateNativeWinOcclusion"
+)
+
 # 尝试导入 WebEngine（Lottie 渲染需要）
 try:
     from PyQt6.QtWebEngineWidgets import QWebEngineView
-    from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineSettings
+    from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineSettings, QWebEngineProfile
     WEBENGINE_AVAILABLE = True
 except ImportError:
     WEBENGINE_AVAILABLE = False
@@ -58,6 +65,43 @@ except ImportError:
 EMOTIONS_DIR = Path(__file__).parent / "emotions"
 HTML_TEMPLATE = Path(__file__).parent / "lottie_player.html"
 
+# 共享的 WebEngine Profile（首次使用时创建，需 QApplication 已存在）
+_shared_profile = None
+
+
+def get_shared_profile() -> "QWebEngineProfile":
+    """获取所有 Lottie 视图共用的 Profile（预热视图和悬浮球共用）
+
+    资源全是 file:// 本地文件，Chromium 不会放进 HTTP 缓存，所以用不落盘的 off-the-record Profile
+    """
+    global _shared_profile
+    if _shared_profile is None:
+        _shared_profile = QWebEngineProfile(QApplication.instance())
+    return _shared_profile
+
+
+# 预热用的隐藏 WebEngine 视图（悬浮球播放器就绪后释放）
+_prewarm_view = None
+
+
+def prewarm_webengine():
+    """在 QApplication 创建后立即拉起 Chromium 渲染进程，缩短悬浮球首次加载时间"""
+    global _prewarm_view
+    if not WEBENGINE_AVAILABLE or _prewarm_view is not None:
+        return
+    _prewarm_view = QWebEngineView()
+    _prewarm_view.setPage(QWebEnginePage(get_shared_profile(), _prewarm_view))
+    _prewarm_view.load(QUrl("about:blank"))
+    logger.debug("🔮 [GUI] WebEngine 预热中")
+
+
+def _release_prewarm():
+    """释放预热视图（真正的播放器已在共享 Profile 上运行）"""
+    global _prewarm_view
+    if _prewarm_view is not None:
+        _prewarm_view.deleteLater()
+        _prewarm_view = None
+
 
 class BallState:
     """悬浮球状态枚举"""
@@ -132,7 +176,10 @@ class FloatingBall(QWidget):
         # 信号中心
         self.signals = signals or FuguangSignals()
         self.signals.state_changed.connect(self.set_state)
-        self.signals.expression_changed.connect(self.set_expression)
+        # 表情信号走队列连接 + 合并：一连串表情只应用最后一个
+        self.signals.expression_changed.connect(
+            self.queue_expression, Qt.ConnectionType.QueuedConnection
+        )
         
         self.current_state = BallState.IDLE
         self.is_awake = False
@@ -141,23 +188,57 @@ class FloatingBall(QWidget):
         # Emoji 状态
         self._current_emoji = ""
         self._expression_override = None  # AI 表情锁定（防止被 SPEAKING 状态覆盖）
+        self._pending_expression = None  # 待应用的 AI 表情（合并突发信号，保留最新）
+        self._webview = None
         self._webview_ready = False
         self._pending_load = None  # 等待 webview 加载完成后再切换
+        self._switch_epoch = 0  # 单调递增的切换序号（JS 端丢弃过期的切换）
+        
+        # GIF 回退：预缩放帧缓存 {name: [(QPixmap, delay_ms), ...]}
+        self._gif_cache: dict = {}
+        self._gif_frames: list = []
+        self._gif_index = 0
+        
+        # 可用表情索引（内存查表，目录变化时重建，切换时不再 stat 文件）
+        self._load_js: dict = {}    # {name: 'loadEmoji("url", '}
+        self._switch_js: dict = {}  # {name: 'switchEmoji("url", '}
+        self._gif_names: set = set()
+        self._refresh_emoji_index()
+        self._emoji_watcher = QFileSystemWatcher(self)
+        if EMOTIONS_DIR.exists():
+            self._emoji_watcher.addPath(str(EMOTIONS_DIR))
+        self._emoji_watcher.directoryChanged.connect(self._refresh_emoji_index)
+        
+        # 单击确认（双击由 Qt 原生 mouseDoubleClickEvent 处理，间隔取系统设置）
+        self._click_timer = QTimer(self)
+        self._click_timer.setSingleShot(True)
+        self._click_timer.timeout.connect(self._handle_single_click)
+        self._suppress_release = False  # 双击后的第二次松开不算单击
         
-        # 双击检测
-        self.click_count = 0
-        self.click_timer = QTimer(self)
-        self.click_timer.timeout.connect(self._handle_click)
+        # 右键菜单（首次右键时构建）
+        self._menu = None
+        self._toggle_action = None
+        
+        # 文件拖放回调（由 FuguangApp 设置）
+        self.drag_enter_handler = None
+        self.drop_handler = None
         
         # 鼠标拖拽
-        self.old_pos = None
+        self.old_pos = None  # 上次鼠标全局坐标 (x, y)
         self._is_dragging = False
-        self._press_pos = None
+        self._press_pos = None  # 按下时的全局坐标 (x, y)
+        
+        # 拖拽时合并 ball_moved 信号（每帧最多一次，HUD 读取的是球的最新位置）
+        self._move_coalesce = QTimer(self)
+        self._move_coalesce.setSingleShot(True)
+        self._move_coalesce.setInterval(16)
+        self._move_coalesce.timeout.connect(self.signals.ball_moved.emit)
         
         # IDLE 随机表情轮播
         self._idle_timer = QTimer(self)
         self._idle_timer.timeout.connect(self._on_idle_tick)
         self._idle_entered_time = 0.0  # 进入 IDLE 状态的时间戳
+        self._idle_paused = False  # 隐藏时暂停了轮播，显示时恢复
         
         # 初始化 UI
         self._init_ui()
@@ -186,6 +267,7 @@ class FloatingBall(QWidget):
     def _init_webview(self):
         """初始化 QWebEngineView（Lottie 渲染）"""
         self._webview = QWebEngineView(self)
+        self._webview.setPage(QWebEnginePage(get_shared_profile(), self._webview))
         self._webview.setGeometry(0, 0, self.BALL_SIZE, self.BALL_SIZE)
         
         # 透明背景
@@ -197,6 +279,19 @@ class FloatingBall(QWidget):
         settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
         settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
         
+        # 关闭 Lottie 播放器用不到的 Chromium 子系统（减少渲染进程内存/CPU）
+        for attr, enabled in (
+            (QWebEngineSettings.WebAttribute.WebGLEnabled, False),
+            (QWebEngineSettings.WebAttribute.PluginsEnabled, False),
+            (QWebEngineSettings.WebAttribute.ErrorPageEnabled, False),
+            (QWebEngineSettings.WebAttribute.PdfViewerEnabled, False),
+            (QWebEngineSettings.WebAttribute.ShowScrollBars, False),
+            (QWebEngineSettings.WebAttribute.FocusOnNavigationEnabled, False),
+            (QWebEngineSettings.WebAttribute.Accelerated2dCanvasEnabled, True),
+            (QWebEngineSettings.WebAttribute.AutoLoadImages, True),
+        ):
+            settings.setAttribute(attr, enabled)
+        
         # 让鼠标事件透传到父 widget
         self._webview.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
         
@@ -209,23 +304,21 @@ class FloatingBall(QWidget):
 
     def _init_fallback_label(self):
         """GIF 回退模式（PyQtWebEngine 未安装时）"""
-        from PyQt6.QtGui import QMovie
         self._emoji_label = QLabel(self)
         self._emoji_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._emoji_label.setGeometry(0, 0, self.BALL_SIZE, self.BALL_SIZE)
         self._emoji_label.setStyleSheet("background: transparent;")
         self._emoji_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
         
+        # 单个定时器驱动帧播放（替代每次切换新建 QMovie）
+        self._gif_timer = QTimer(self)
+        self._gif_timer.setSingleShot(True)
+        self._gif_timer.timeout.connect(self._on_gif_tick)
+        
         # 加载启动 GIF（随机 partying 或 melting）
         startup = random.choice(STARTUP_EMOJIS)
-        gif_path = EMOTIONS_DIR / f"{startup}.gif"
-        if not gif_path.exists():
-            gif_path = EMOTIONS_DIR / "neutral.gif"
-        if gif_path.exists():
-            movie = QMovie(str(gif_path))
-            movie.setScaledSize(QSize(self.BALL_SIZE, self.BALL_SIZE))
-            self._emoji_label.setMovie(movie)
-            movie.start()
+        if not self._play_gif(startup):
+            self._play_gif("neutral")
         
         self._webview_ready = True  # 回退模式直接就绪
         logger.info("🔮 [GUI] 回退到 GIF 模式")
@@ -234,6 +327,7 @@ class FloatingBall(QWidget):
         """WebView HTML 加载完成回调"""
         if ok:
             self._webview_ready = True
+            _release_prewarm()
             logger.info("🔮 [GUI] Lottie 播放器就绪")
             
             # 加载启动表情（随机 partying 或 melting）
@@ -251,41 +345,57 @@ class FloatingBall(QWidget):
     # Emoji 切换核心（Lottie + CSS 过渡）
     # ========================
     
-    def _get_emoji_json_path(self, name: str) -> Optional[str]:
-        """获取 Lottie JSON 文件的 file:// URL"""
-        json_path = EMOTIONS_DIR / f"{name}.json"
-        if json_path.exists():
-            # 转换为 file:// URL（WebEngine 需要）
-            return QUrl.fromLocalFile(str(json_path)).toString()
-        logger.warning(f"🔮 [GUI] Lottie 文件不存在: {json_path}")
-        return None
+    def _refresh_emoji_index(self, *_):
+        """扫描 emotions/ 目录，重建可用表情索引（目录变化时由 watcher 触发）
+
+        同时预生成每个表情的 JS 调用前缀，切换时只需拼上 epoch
+        """
+        self._load_js = {}
+        self._switch_js = {}
+        for p in EMOTIONS_DIR.glob("*.json"):
+            url = QUrl.fromLocalFile(str(p)).toString()
+            self._load_js[p.stem] = f'loadEmoji("{url}", '
+            self._switch_js[p.stem] = f'switchEmoji("{url}", '
+        self._gif_names = {p.stem for p in EMOTIONS_DIR.glob("*.gif")}
+        self._gif_cache.clear()
+        logger.debug(f"🔮 [GUI] 表情索引: {len(self._switch_js)} JSON / {len(self._gif_names)} GIF")
+
+    def _get_emoji_js(self, table: dict, name: str) -> Optional[str]:
+        """查预生成的 JS 调用前缀（文件不存在时返回 None）"""
+        js = table.get(name)
+        if js is None:
+            logger.warning(f"🔮 [GUI] Lottie 文件不存在: {EMOTIONS_DIR / f'{name}.json'}")
+        return js
+
+    def _run_emoji_js(self, js_prefix: str):
+        """执行表情切换 JS（附带单调递增的 epoch）"""
+        self._switch_epoch += 1
+        self._webview.page().runJavaScript(f"{js_prefix}{self._switch_epoch});")
 
     def _do_load(self, name: str):
         """直接加载 Lottie（无过渡，用于初始化）"""
-        url = self._get_emoji_json_path(name)
-        if not url:
+        js = self._get_emoji_js(self._load_js, name)
+        if not js:
             if name != "neutral":
-                url = self._get_emoji_json_path("neutral")
-            if not url:
+                js = self._get_emoji_js(self._load_js, "neutral")
+            if not js:
                 return
         
-        js = f'loadEmoji("{url}");'
-        self._webview.page().runJavaScript(js)
+        self._run_emoji_js(js)
         self._current_emoji = name
         logger.debug(f"🔮 [GUI] Lottie 初始加载: {name}")
 
     def _do_switch(self, name: str):
         """带压扁弹开过渡切换（CSS 动画）"""
-        url = self._get_emoji_json_path(name)
-        if not url:
+        js = self._get_emoji_js(self._switch_js, name)
+        if not js:
             if name != "neutral":
-                url = self._get_emoji_json_path("neutral")
+                js = self._get_emoji_js(self._switch_js, "neutral")
                 name = "neutral"
-            if not url:
+            if not js:
                 return
         
-        js = f'switchEmoji("{url}");'
-        self._webview.page().runJavaScript(js)
+        self._run_emoji_js(js)
         self._current_emoji = name
         logger.debug(f"🔮 [GUI] Lottie 切换: {name}")
 
@@ -305,21 +415,60 @@ class FloatingBall(QWidget):
 
     def _switch_gif_fallback(self, name: str):
         """GIF 回退切换"""
-        from PyQt6.QtGui import QMovie
-        gif_path = EMOTIONS_DIR / f"{name}.gif"
-        if not gif_path.exists():
-            gif_path = EMOTIONS_DIR / "neutral.gif"
-        if gif_path.exists():
-            movie = QMovie(str(gif_path))
-            movie.setScaledSize(QSize(self.BALL_SIZE, self.BALL_SIZE))
-            self._emoji_label.setMovie(movie)
-            movie.start()
+        if self._play_gif(name) or self._play_gif("neutral"):
             self._current_emoji = name
 
+    def _load_gif_frames(self, name: str) -> list:
+        """解码 GIF 并一次性缩放所有帧（按名称缓存，只解码一次）"""
+        frames = self._gif_cache.get(name)
+        if frames is not None:
+            return frames
+        
+        frames = []
+        if name in self._gif_names:
+            reader = QImageReader(str(EMOTIONS_DIR / f"{name}.gif"))
+            while reader.canRead():
+                image = reader.read()
+                if image.isNull():
+                    break
+                delay = reader.nextImageDelay()
+                scaled = image.scaled(
+                    self.BALL_SIZE, self.BALL_SIZE,
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation
+                )
+                frames.append((QPixmap.fromImage(scaled), delay if delay > 0 else 100))
+        self._gif_cache[name] = frames
+        return frames
+
+    def _play_gif(self, name: str) -> bool:
+        """从缓存播放预缩放的 GIF 帧序列，返回是否成功"""
+        frames = self._load_gif_frames(name)
+        if not frames:
+            return False
+        self._gif_timer.stop()
+        self._gif_frames = frames
+        self._gif_index = 0
+        self._emoji_label.setPixmap(frames[0][0])
+        if len(frames) > 1:
+            self._gif_timer.start(frames[0][1])
+        return True
+
+    def _on_gif_tick(self):
+        """定时器回调：显示下一帧"""
+        if not self._gif_frames:
+            return
+        self._gif_index = (self._gif_index + 1) % len(self._gif_frames)
+        pixmap, delay = self._gif_frames[self._gif_index]
+        self._emoji_label.setPixmap(pixmap)
+        self._gif_timer.start(delay)
+
     def set_state(self, state: str):
         """设置悬浮球状态 — 自动映射到对应 emoji"""
         if state not in STATE_EMOJI_MAP:
             return
+        # 先应用排队中的 AI 表情：表情信号先于状态信号发出，必须先锁定表情再处理 SPEAKING
+        self._apply_pending_expression()
         self.current_state = state
         # SPEAKING 状态：如果 AI 已指定表情（如 [Sorrow]），保留它，不覆盖为 joy
         if state == BallState.SPEAKING and self._expression_override:
@@ -365,6 +514,19 @@ class FloatingBall(QWidget):
         next_ms = random.randint(5000, 8000)
         self._idle_timer.start(next_ms)
 
+    def queue_expression(self, expression: str):
+        """排队设置 AI 表情 — 同一轮事件循环内的多次调用只应用最新一个"""
+        scheduled = self._pending_expression is not None
+        self._pending_expression = expression
+        if not scheduled:
+            QTimer.singleShot(0, self._apply_pending_expression)
+
+    def _apply_pending_expression(self):
+        """应用排队中最新的 AI 表情（已被 set_state 提前应用时为空操作）"""
+        expression, self._pending_expression = self._pending_expression, None
+        if expression is not None:
+            self.set_expression(expression)
+
     def set_expression(self, expression: str):
         """设置 AI 表情 — 由 AI 回复中的表情标签驱动
         每个表情标签对应一组 emoji，随机抽一个播放
@@ -392,68 +554,78 @@ class FloatingBall(QWidget):
     
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            self.old_pos = event.globalPosition().toPoint()
-            self._press_pos = event.globalPosition().toPoint()
+            pos = event.globalPosition()
+            self.old_pos = self._press_pos = (int(pos.x()), int(pos.y()))
             self._is_dragging = False
 
     def mouseMoveEvent(self, event):
-        if self.old_pos:
-            delta = event.globalPosition().toPoint() - self.old_pos
-            self.move(self.x() + delta.x(), self.y() + delta.y())
-            self.old_pos = event.globalPosition().toPoint()
-            self.signals.ball_moved.emit()
+        if self.old_pos is not None:
+            # 只读一次全局坐标，整数运算（高回报率鼠标下每像素都会触发）
+            pos = event.globalPosition()
+            gx, gy = int(pos.x()), int(pos.y())
+            old_x, old_y = self.old_pos
+            self.move(self.x() + gx - old_x, self.y() + gy - old_y)
+            self.old_pos = (gx, gy)
+            if not self._move_coalesce.isActive():
+                self._move_coalesce.start()
             
-            if self._press_pos:
-                moved = event.globalPosition().toPoint() - self._press_pos
-                if abs(moved.x()) > 5 or abs(moved.y()) > 5:
+            if self._press_pos is not None and not self._is_dragging:
+                press_x, press_y = self._press_pos
+                if abs(gx - press_x) > 5 or abs(gy - press_y) > 5:
                     self._is_dragging = True
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            if not self._is_dragging:
-                self.click_count += 1
-                if not self.click_timer.isActive():
-                    self.click_timer.start(300)
+            if self._suppress_release:
+                self._suppress_release = False
+            elif not self._is_dragging:
+                self._click_timer.start(QApplication.doubleClickInterval())
             else:
-                self.click_count = 0
-                self.click_timer.stop()
+                self._click_timer.stop()
         self.old_pos = None
         self._press_pos = None
         self._is_dragging = False
 
-    def _handle_click(self):
-        """处理点击（区分单击/双击）"""
-        self.click_timer.stop()
-        
-        if self.click_count >= 2:
+    def mouseDoubleClickEvent(self, event):
+        """双击 - 截图分析（取消待确认的单击）"""
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._click_timer.stop()
+            self._suppress_release = True
             logger.info("🔮 [GUI] 双击 - 触发截图分析")
             self.signals.screenshot_request.emit()
+
+    def _handle_single_click(self):
+        """处理单击（双击间隔内未出现第二次点击）"""
+        if self.is_recording:
+            logger.info("🔮 [GUI] 单击 - 停止录音")
+            self.is_recording = False
+            self.signals.ptt_toggle.emit(False)
+        elif self.current_state == BallState.THINKING:
+            logger.info("🔮 [GUI] 单击 - AI 思考中，请稍候")
+        elif self.current_state == BallState.SPEAKING:
+            logger.info("🔮 [GUI] 单击 - 打断说话 + 开始录音")
+            self.is_recording = True
+            self.signals.ptt_toggle.emit(True)
         else:
-            if self.is_recording:
-                logger.info("🔮 [GUI] 单击 - 停止录音")
-                self.is_recording = False
-                self.signals.ptt_toggle.emit(False)
-            elif self.current_state == BallState.THINKING:
-                logger.info("🔮 [GUI] 单击 - AI 思考中，请稍候")
-            elif self.current_state == BallState.SPEAKING:
-                logger.info("🔮 [GUI] 单击 - 打断说话 + 开始录音")
-                self.is_recording = True
-                self.signals.ptt_toggle.emit(True)
+            if not self.is_awake:
+                logger.info("🔮 [GUI] 单击 - 唤醒 + 开始录音")
+                self.is_awake = True
+                self.signals.wake_up.emit()
             else:
-                if not self.is_awake:
-                    logger.info("🔮 [GUI] 单击 - 唤醒 + 开始录音")
-                    self.is_awake = True
-                    self.signals.wake_up.emit()
-                else:
-                    logger.info("🔮 [GUI] 单击 - 开始录音")
-                self.is_recording = True
-                self.set_state(BallState.LISTENING)
-                self.signals.ptt_toggle.emit(True)
-        
-        self.click_count = 0
+                logger.info("🔮 [GUI] 单击 - 开始录音")
+            self.is_recording = True
+            self.set_state(BallState.LISTENING)
+            self.signals.ptt_toggle.emit(True)
 
     def contextMenuEvent(self, event):
-        """右键菜单"""
+        """右键菜单（首次打开时构建，之后复用，只更新唤醒/休眠文字）"""
+        if self._menu is None:
+            self._menu = self._build_menu()
+        self._toggle_action.setText("休眠" if self.is_awake else "唤醒")
+        self._menu.exec(event.globalPos())
+
+    def _build_menu(self) -> "QMenu":
+        """构建右键菜单（样式表只解析一次）"""
         menu = QMenu(self)
         menu.setStyleSheet("""
             QMenu {
@@ -467,9 +639,9 @@ class FloatingBall(QWidget):
             }
         """)
         
-        toggle_action = QAction("休眠" if self.is_awake else "唤醒", self)
-        toggle_action.triggered.connect(self._toggle_wake_sleep)
-        menu.addAction(toggle_action)
+        self._toggle_action = QAction("唤醒", self)
+        self._toggle_action.triggered.connect(self._toggle_wake_sleep)
+        menu.addAction(self._toggle_action)
         
         screenshot_action = QAction("📸 截图分析", self)
         screenshot_action.triggered.connect(self.signals.screenshot_request.emit)
@@ -485,7 +657,7 @@ class FloatingBall(QWidget):
         quit_action.triggered.connect(self._quit)
         menu.addAction(quit_action)
         
-        menu.exec(event.globalPos())
+        return menu
 
     def _quit(self):
         self.signals.quit_request.emit()
@@ -504,15 +676,54 @@ class FloatingBall(QWidget):
             self.set_state(BallState.LISTENING)
             self.signals.wake_up.emit()
 
+    def hideEvent(self, event):
+        """隐藏/最小化时暂停 IDLE 轮播和 GIF 帧定时器（不可见时不做无用切换）"""
+        self._idle_paused = self._idle_timer.isActive()
+        self._stop_idle_timer()
+        if not WEBENGINE_AVAILABLE:
+            self._gif_timer.stop()
+        super().hideEvent(event)
+
+    def showEvent(self, event):
+        """重新显示时恢复被暂停的定时器"""
+        super().showEvent(event)
+        if self._idle_paused and self.current_state == BallState.IDLE:
+            self._start_idle_timer()
+        self._idle_paused = False
+        if not WEBENGINE_AVAILABLE and len(self._gif_frames) > 1 and not self._gif_timer.isActive():
+            self._gif_timer.start(self._gif_frames[self._gif_index][1])
+
+    def closeEvent(self, event):
+        """关闭时断开信号并释放 WebEngine（避免信号引用让 Chromium 渲染进程滞留）"""
+        for signal, slot in (
+            (self.signals.state_changed, self.set_state),
+            (self.signals.expression_changed, self.queue_expression),
+        ):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass  # 已断开
+        self._stop_idle_timer()
+        self._webview_ready = False
+        if WEBENGINE_AVAILABLE and self._webview is not None:
+            self._webview.deleteLater()  # page 是 webview 的子对象，一并释放
+            self._webview = None
+        elif not WEBENGINE_AVAILABLE:
+            self._gif_timer.stop()
+            self._gif_cache.clear()
+        super().closeEvent(event)
+
     def dragEnterEvent(self, event):
-        if hasattr(self, 'drag_enter_handler') and self.drag_enter_handler:
-            self.drag_enter_handler(event)
+        handler = self.drag_enter_handler
+        if handler is not None:
+            handler(event)
         else:
             super().dragEnterEvent(event)
 
     def dropEvent(self, event):
-        if hasattr(self, 'drop_handler') and self.drop_handler:
-            self.drop_handler(event)
+        handler = self.drop_handler
+        if handler is not None:
+            handler(event)
         else:
             super().dropEvent(event)
 
@@ -3,10 +3,15 @@
 
 URL 格式: https://fonts.gstatic.com/s/e/notoemoji/latest/{codepoint}/lottie.json
 
-使用方法: python download_lottie.py
+使用方法: python download_lottie.py [--minify]
+    --minify  下载后压缩 JSON（去掉空白，装了 orjson 时用 orjson）
 """
+import argparse
+import json
 import urllib.request
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # 目标目录
@@ -36,37 +41,88 @@ EMOJI_MAP = {
 
 BASE_URL = "https://fonts.gstatic.com/s/e/notoemoji/latest/{code}/lottie.json"
 
-def download_all():
+# orjson（可选）：原生 JSON 解析/序列化，仅 --minify 时使用
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+MAX_WORKERS = 8  # 并发下载线程数（纯网络 IO，线程足够）
+
+
+def _minify(path: Path):
+    """原地压缩 JSON 文件（orjson 优先，回退标准库 json）"""
+    data = path.read_bytes()
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(orjson.loads(data), option=orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(json.loads(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    path.write_bytes(data)
+
+
+def _fetch(code: str, names: list, minify: bool = False) -> int:
+    """下载一个码点的 Lottie JSON，写入所有映射到它的文件名，返回字节数
+
+    边下边写（固定 64 KB 缓冲），先写临时文件再原子替换，
+    中途失败不会留下被"已存在"逻辑跳过的半截文件
+    """
+    url = BASE_URL.format(code=code)
+    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+    first = EMOTIONS_DIR / f"{names[0]}.json"
+    tmp = first.with_suffix(".json.tmp")
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp, open(tmp, "wb") as fh:
+            shutil.copyfileobj(resp, fh, 64 * 1024)
+        if minify:
+            _minify(tmp)
+        os.replace(tmp, first)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    for name in names[1:]:
+        shutil.copyfile(first, EMOTIONS_DIR / f"{name}.json")
+    return first.stat().st_size
+
+
+def download_all(minify: bool = False):
     total = len(EMOJI_MAP)
     success = 0
     failed = []
     
+    # 按码点分组：多个名称共用同一码点时（如 wave / listening）只下载一次
+    pending = {}
     for name, code in EMOJI_MAP.items():
-        target = EMOTIONS_DIR / f"{name}.json"
-        url = BASE_URL.format(code=code)
-        
-        if target.exists():
+        if (EMOTIONS_DIR / f"{name}.json").exists():
             print(f"  ✓ {name}.json 已存在，跳过")
             success += 1
-            continue
-        
-        print(f"  ⬇ 下载 {name}.json ({code})...", end=" ", flush=True)
-        try:
-            req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                data = resp.read()
-                target.write_bytes(data)
-                size_kb = len(data) / 1024
-                print(f"OK ({size_kb:.1f} KB)")
-                success += 1
-        except Exception as e:
-            print(f"FAILED: {e}")
-            failed.append(name)
+        else:
+            pending.setdefault(code, []).append(name)
+    
+    # 并发下载（每个请求都要付一次 TLS + HTTP 往返，串行时总耗时 = N × RTT）
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(_fetch, code, names, minify): (code, names)
+            for code, names in pending.items()
+        }
+        for future in as_completed(futures):
+            code, names = futures[future]
+            label = ", ".join(f"{name}.json" for name in names)
+            try:
+                size_kb = future.result() / 1024
+                print(f"  ⬇ {label} ({code}) OK ({size_kb:.1f} KB)")
+                success += len(names)
+            except Exception as e:
+                print(f"  ⬇ {label} ({code}) FAILED: {e}")
+                failed.extend(names)
     
     print(f"\n完成: {success}/{total} 成功")
     if failed:
         print(f"失败: {failed}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="下载 Noto Animated Emoji 的 Lottie JSON")
+    parser.add_argument("--minify", action="store_true", help="下载后压缩 JSON")
+    args = parser.parse_args()
     print(f"📦 Lottie JSON 下载器 → {EMOTIONS_DIR}\n")
-    download_all()
+    download_all(minify=args.minify)
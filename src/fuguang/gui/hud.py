@@ -11,9 +11,16 @@
 
 依赖：
     pip install markdown pygments
+    pip install markdown-it-py  # 可选，更快的 Markdown 解析
 """
 
+import re
+import html as _html
 import logging
+import time
+import functools
+import importlib.util
+from collections import OrderedDict
 from typing import Optional
 
 logger = logging.getLogger("Fuguang")
@@ -24,28 +31,26 @@ try:
         QGraphicsDropShadowEffect, QSizePolicy
     )
     from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QPoint
-    from PyQt6.QtGui import QColor, QFont, QPainter, QPainterPath, QBrush, QPen
+    from PyQt6.QtGui import (
+        QColor, QFont, QPainter, QPainterPath, QBrush, QPen, QTextDocument
+    )
     PYQT_AVAILABLE = True
 except ImportError:
     PYQT_AVAILABLE = False
 
-# Markdown → HTML 转换
-try:
-    import markdown
-    from markdown.extensions.codehilite import CodeHiliteExtension
-    from markdown.extensions.fenced_code import FencedCodeExtension
-    from markdown.extensions.tables import TableExtension
-    MARKDOWN_AVAILABLE = True
-except ImportError:
-    MARKDOWN_AVAILABLE = False
+# Markdown → HTML 转换（优先 markdown-it-py，未安装时回退 python-markdown）
+# 启动时只检测是否安装，首次渲染时才真正导入
+MARKDOWN_IT_AVAILABLE = importlib.util.find_spec("markdown_it") is not None
+MARKDOWN_AVAILABLE = (
+    MARKDOWN_IT_AVAILABLE or importlib.util.find_spec("markdown") is not None
+)
+if not MARKDOWN_AVAILABLE:
     logger.warning("⚠️ markdown 未安装，HUD 将以纯文本模式显示")
 
-# 代码高亮 CSS
-try:
-    from pygments.formatters import HtmlFormatter
-    PYGMENTS_AVAILABLE = True
-except ImportError:
-    PYGMENTS_AVAILABLE = False
+# 代码高亮（Pygments 较重，只检测是否安装，首次需要高亮时才导入）
+PYGMENTS_AVAILABLE = importlib.util.find_spec("pygments") is not None
+_HTML_FORMATTER = None
+_HTML_FORMATTER_NOWRAP = None
 
 
 # ================================
@@ -201,13 +206,47 @@ hr {
 """
 
 
+def _get_formatter(nowrap: bool = False):
+    """获取 Pygments HtmlFormatter（首次调用时才导入 pygments.formatters）
+
+    nowrap=True 的版本只输出高亮后的 span，不带外层 <div><pre>
+    """
+    global _HTML_FORMATTER, _HTML_FORMATTER_NOWRAP
+    if _HTML_FORMATTER is None:
+        from pygments.formatters import HtmlFormatter
+        _HTML_FORMATTER = HtmlFormatter(style="monokai", noclasses=False)
+        _HTML_FORMATTER_NOWRAP = HtmlFormatter(style="monokai", noclasses=False, nowrap=True)
+    return _HTML_FORMATTER_NOWRAP if nowrap else _HTML_FORMATTER
+
+
+# 代码块高亮结果缓存 {(lexer 类, 代码): html}（只给 HUD 自己的 markdown-it 渲染用）
+_HIGHLIGHT_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_HIGHLIGHT_CACHE_SIZE = 512
+
+
+def reset_highlight_cache():
+    """清空代码高亮缓存（切换 Pygments 主题后调用）"""
+    global _HTML_FORMATTER, _HTML_FORMATTER_NOWRAP
+    _HIGHLIGHT_CACHE.clear()
+    _HTML_FORMATTER = None
+    _HTML_FORMATTER_NOWRAP = None
+    _get_highlight_css.cache_clear()
+    _document_css.cache_clear()
+    _resolve_lexer.cache_clear()
+
+
+def _has_fenced_code(text: str) -> bool:
+    """文本中是否有围栏代码块（只有这时才需要 Pygments 高亮）"""
+    return "```" in text or "~~~" in text
+
+
+@functools.lru_cache(maxsize=1)
 def _get_highlight_css() -> str:
     """获取 Pygments 代码高亮 CSS（Monokai 暗色主题）"""
     if not PYGMENTS_AVAILABLE:
         return ""
     try:
-        formatter = HtmlFormatter(style="monokai", noclasses=False)
-        css = formatter.get_style_defs('.codehilite')
+        css = _get_formatter().get_style_defs('.codehilite')
         # 覆盖背景色为透明（我们用自己的 pre 背景）
         css += "\n.codehilite { background: transparent !important; }"
         return css
@@ -215,34 +254,159 @@ def _get_highlight_css() -> str:
         return ""
 
 
-def _md_to_html(text: str) -> str:
-    """将 Markdown 文本转换为 HTML"""
-    if not MARKDOWN_AVAILABLE:
-        # 回退：简单的纯文本转 HTML
-        import html
-        escaped = html.escape(text)
-        return f"<p>{escaped.replace(chr(10), '<br>')}</p>"
-    
-    try:
+@functools.lru_cache(maxsize=2)
+def _document_css(highlight: bool) -> str:
+    """HUD 文档的默认样式表（赛博主题 + 可选的代码高亮），进程内只拼接一次"""
+    css = _CYBER_CSS
+    if highlight:
+        css += "\n" + _get_highlight_css()
+    return css
+
+
+# 复用的 Markdown 实例 {是否代码高亮: markdown.Markdown}（扩展的正则只编译一次）
+_MD_INSTANCES = {}
+
+
+def _get_md(highlight: bool) -> "markdown.Markdown":
+    """获取（首次调用时创建）复用的 Markdown 转换器"""
+    md = _MD_INSTANCES.get(highlight)
+    if md is None:
+        import markdown
+        from markdown.extensions.fenced_code import FencedCodeExtension
+        from markdown.extensions.tables import TableExtension
         extensions = [
             FencedCodeExtension(),
             TableExtension(),
             'nl2br',  # 换行符转 <br>
         ]
-        # 如果 Pygments 可用，启用代码高亮
-        if PYGMENTS_AVAILABLE:
+        if highlight:
+            from markdown.extensions.codehilite import CodeHiliteExtension
             extensions.insert(0, CodeHiliteExtension(
                 linenums=False,
                 css_class='codehilite',
-                guess_lang=True
+                guess_lang=False  # 不跑 guess_lexer，未标语言的代码块按纯文本输出
             ))
-        
-        html_content = markdown.markdown(text, extensions=extensions)
+        md = markdown.Markdown(extensions=extensions)
+        _MD_INSTANCES[highlight] = md
+    return md
+
+
+# markdown-it-py 渲染器（首次使用时创建）
+_MD_IT = None
+
+
+@functools.lru_cache(maxsize=64)
+def _resolve_lexer(lang: str):
+    """按围栏语言名查找 lexer（带缓存），未知语言返回 None"""
+    from pygments.lexers import find_lexer_class_by_name
+    from pygments.util import ClassNotFound
+    try:
+        return find_lexer_class_by_name(lang.lower())()
+    except ClassNotFound:
+        return None
+
+
+def _highlight_fence(code: str, lang: str) -> str:
+    """高亮一个围栏代码块，结构与 codehilite 相同；无法高亮时返回空串"""
+    if not PYGMENTS_AVAILABLE or not lang:
+        return ""
+    from pygments import highlight
+    lexer = _resolve_lexer(lang)
+    if lexer is None:
+        return ""
+    key = (type(lexer), code)
+    result = _HIGHLIGHT_CACHE.get(key)
+    if result is None:
+        body = highlight(code, lexer, _get_formatter(nowrap=True))
+        result = f'<div class="codehilite"><pre><code>{body}</code></pre></div>\n'
+        _HIGHLIGHT_CACHE[key] = result
+        if len(_HIGHLIGHT_CACHE) > _HIGHLIGHT_CACHE_SIZE:
+            _HIGHLIGHT_CACHE.popitem(last=False)
+    else:
+        _HIGHLIGHT_CACHE.move_to_end(key)
+    return result
+
+
+def _render_fence(renderer, tokens, idx, options, env):
+    """markdown-it 的 fence 渲染规则
+
+    highlight 回调的结果除非以 <pre 开头都会被再套一层 <pre><code>，
+    所以在这里直接输出 codehilite 结构；不高亮的代码块交回默认规则
+    """
+    from markdown_it.common.utils import unescapeAll
+    token = tokens[idx]
+    info = unescapeAll(token.info).strip() if token.info else ""
+    lang = info.split(maxsplit=1)[0] if info else ""
+    highlighted = _highlight_fence(token.content, lang)
+    if highlighted:
+        return highlighted
+    return type(renderer).fence(renderer, tokens, idx, options, env)
+
+
+def _get_md_it() -> "MarkdownIt":
+    """获取复用的 markdown-it 渲染器（表格 + 删除线 + 换行转 <br> + 代码高亮）"""
+    global _MD_IT
+    if _MD_IT is None:
+        from markdown_it import MarkdownIt
+        _MD_IT = MarkdownIt("commonmark", {"breaks": True}).enable(["table", "strikethrough"])
+        _MD_IT.add_render_rule("fence", _render_fence)
+    return _MD_IT
+
+
+# Markdown → HTML 结果缓存（LRU，聊天记录重复打开时不再重新解析）
+_MD_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_MD_CACHE_SIZE = 256
+
+
+# 可能触发 Markdown 语法的字符/行首标记；都没有时就是纯文本，不必走解析器
+_MD_SYNTAX_RE = re.compile(
+    r"[`*_#|\[\]<>&]|~~|^[ \t]*(?:[-+]|\d+[.)])[ \t]|^[ \t]*(?:-{2,}|={2,})[ \t]*$",
+    re.MULTILINE
+)
+
+
+def _md_to_html(text: str) -> str:
+    """将 Markdown 文本转换为 HTML"""
+    if not MARKDOWN_AVAILABLE or not _MD_SYNTAX_RE.search(text):
+        # 纯文本（大多数口语回复）或没有 Markdown 库：转义后换行转 <br>
+        escaped = _html.escape(text)
+        return f"<p>{escaped.replace(chr(10), '<br>')}</p>"
+    
+    cached = _MD_CACHE.get(text)
+    if cached is not None:
+        _MD_CACHE.move_to_end(text)
+        return cached
+    
+    try:
+        if MARKDOWN_IT_AVAILABLE:
+            html_content = _get_md_it().render(text)
+        else:
+            # 有代码块且 Pygments 可用时才启用代码高亮
+            highlight = PYGMENTS_AVAILABLE and _has_fenced_code(text)
+            html_content = _get_md(highlight).reset().convert(text)
+        _MD_CACHE[text] = html_content
+        if len(_MD_CACHE) > _MD_CACHE_SIZE:
+            _MD_CACHE.popitem(last=False)
         return html_content
     except Exception as e:
         logger.warning(f"Markdown 转换失败: {e}")
-        import html
-        return f"<p>{html.escape(text)}</p>"
+        return f"<p>{_html.escape(text)}</p>"
+
+
+# 聊天记录气泡模板（{content} 为已转义/渲染好的 HTML）
+_CHAT_HEADER = '<div class="chat-header">📜 聊天记录</div>'
+_USER_BUBBLE_TPL = '''
+                <div style="display:flex; flex-direction:column; align-items:flex-end;">
+                    <div class="chat-role chat-role-user">👤 指挥官</div>
+                    <div class="chat-bubble chat-bubble-user">{content}</div>
+                    <div class="chat-time chat-time-right">{time}</div>
+                </div>'''
+_AI_BUBBLE_TPL = '''
+                <div style="display:flex; flex-direction:column; align-items:flex-start;">
+                    <div class="chat-role chat-role-ai">🤖 扶光</div>
+                    <div class="chat-bubble chat-bubble-ai">{content}</div>
+                    <div class="chat-time">{time}</div>
+                </div>'''
 
 
 class HolographicHUD(QWidget):
@@ -269,6 +433,7 @@ class HolographicHUD(QWidget):
         
         self.parent_ball = parent_ball
         self._current_text = ""
+        self._last_body_html = None  # 上次 _set_html 的内容（相同则跳过重新排版）
         
         self._init_ui()
         self._init_animations()
@@ -304,8 +469,13 @@ class HolographicHUD(QWidget):
         self.browser.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.browser.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         
-        # 构建完整 CSS（赛博主题 + Pygments 高亮）
-        full_css = _CYBER_CSS + "\n" + _get_highlight_css()
+        # 复用同一个 QTextDocument：CSS 作为默认样式表只设置一次，
+        # 宽度先于 setHtml 设定，内容只排版一遍
+        self._doc = QTextDocument(self.browser)
+        self._doc.setTextWidth(self.MAX_WIDTH - 30)  # 减去内边距
+        self._doc_css = _document_css(False)
+        self._doc.setDefaultStyleSheet(self._doc_css)
+        self.browser.setDocument(self._doc)
         
         # 设置 QTextBrowser 样式
         self.browser.setStyleSheet("""
@@ -332,9 +502,6 @@ class HolographicHUD(QWidget):
             }
         """)
         
-        # 保存 CSS 供后续使用
-        self._full_css = full_css
-        
         layout.addWidget(self.browser)
         
         # 投影阴影效果
@@ -344,10 +511,37 @@ class HolographicHUD(QWidget):
         shadow.setOffset(0, 0)
         self.setGraphicsEffect(shadow)
         
+        # 背景绘制用的颜色/画笔（只创建一次，paintEvent 直接复用）
+        self._bg_brush = QBrush(QColor(10, 15, 20, 220))  # 半透明黑色背景
+        self._border_pen = QPen(QColor(0, 229, 255, 50))  # 赛博青描边
+        self._border_pen.setWidth(1)
+        self._bg_path = None       # 圆角矩形路径（尺寸变化时重建）
+        self._bg_path_size = None
+        
         # 自动隐藏定时器
         self._hide_timer = QTimer(self)
         self._hide_timer.setSingleShot(True)
         self._hide_timer.timeout.connect(self._auto_hide)
+        
+        # 位置跟随定时器（100ms，只在 HUD 可见时运行，隐藏时不再空转）
+        self._follow_timer = QTimer(self)
+        self._follow_timer.setInterval(100)
+        self._follow_timer.timeout.connect(self.update_position)
+        
+        # 位置更新合并（每帧最多算一次），连续的 update_position 调用只触发一次
+        self._pos_timer = QTimer(self)
+        self._pos_timer.setSingleShot(True)
+        self._pos_timer.setInterval(16)
+        self._pos_timer.timeout.connect(self._do_update_position)
+        
+        # 屏幕可用区域缓存（屏幕增删/主屏切换/任务栏变化时失效）
+        self._screen_geo = None
+        self._geo_screen = None  # 已连接 availableGeometryChanged 的屏幕
+        app = QApplication.instance()
+        if app is not None:
+            app.screenAdded.connect(self._invalidate_screen_geo)
+            app.screenRemoved.connect(self._invalidate_screen_geo)
+            app.primaryScreenChanged.connect(self._invalidate_screen_geo)
     
     def _init_animations(self):
         """初始化动画（留空，后续可加淡入淡出）"""
@@ -428,38 +622,9 @@ class HolographicHUD(QWidget):
             self._hide_timer.stop()
             return
 
-        import datetime
-        parts = ['<div class="chat-header">📜 聊天记录</div>']
-
-        for msg in messages:
-            role = msg.get('role', 'user')
-            content = msg.get('content', '')
-            ts = msg.get('created_at', 0)
-
-            # 格式化时间
-            try:
-                time_str = datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
-            except Exception:
-                time_str = ''
-
-            if role == 'user':
-                parts.append(f'''
-                <div style="display:flex; flex-direction:column; align-items:flex-end;">
-                    <div class="chat-role chat-role-user">👤 指挥官</div>
-                    <div class="chat-bubble chat-bubble-user">{self._escape(content)}</div>
-                    <div class="chat-time chat-time-right">{time_str}</div>
-                </div>''')
-            else:
-                # AI 回复支持 Markdown
-                ai_html = _md_to_html(content)
-                parts.append(f'''
-                <div style="display:flex; flex-direction:column; align-items:flex-start;">
-                    <div class="chat-role chat-role-ai">🤖 扶光</div>
-                    <div class="chat-bubble chat-bubble-ai">{ai_html}</div>
-                    <div class="chat-time">{time_str}</div>
-                </div>''')
-
-        html = '\n'.join(parts)
+        html = '\n'.join(
+            [_CHAT_HEADER] + [self._format_history_message(msg) for msg in messages]
+        )
         self._set_html(html)
         self._show_at_ball()
         self._hide_timer.stop()  # 聊天记录不自动隐藏
@@ -468,13 +633,53 @@ class HolographicHUD(QWidget):
         scrollbar = self.browser.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
 
+    @classmethod
+    def _format_history_message(cls, msg: dict) -> str:
+        """渲染单条聊天记录"""
+        content = msg.get('content', '')
+
+        # 格式化时间（time.localtime 不用构造 datetime 对象）
+        try:
+            time_str = time.strftime('%H:%M:%S', time.localtime(msg.get('created_at', 0)))
+        except Exception:
+            time_str = ''
+
+        if msg.get('role', 'user') == 'user':
+            return _USER_BUBBLE_TPL.format(content=cls._escape(content), time=time_str)
+        # AI 回复支持 Markdown（_md_to_html 有缓存，重复打开记录不再解析）
+        return _AI_BUBBLE_TPL.format(content=_md_to_html(content), time=time_str)
+
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def _escape(text: str) -> str:
         """HTML 转义"""
-        import html as _html
         return _html.escape(text).replace('\n', '<br>')
     
-    def update_position(self):
+    def update_position(self, immediate=False):
+        """请求更新 HUD 位置（默认合并到下一帧执行；immediate=True 立即定位）"""
+        if immediate:
+            self._pos_timer.stop()
+            self._do_update_position()
+        elif not self._pos_timer.isActive():
+            self._pos_timer.start()
+    
+    def _invalidate_screen_geo(self, *_):
+        """屏幕配置变化，下次重新读取可用区域"""
+        self._screen_geo = None
+    
+    def _get_screen_geo(self):
+        """主屏可用区域（缓存）"""
+        if self._screen_geo is None:
+            screen = QApplication.primaryScreen()
+            if not screen:
+                return None
+            if screen is not self._geo_screen:
+                screen.availableGeometryChanged.connect(self._invalidate_screen_geo)
+                self._geo_screen = screen
+            self._screen_geo = screen.availableGeometry()
+        return self._screen_geo
+    
+    def _do_update_position(self):
         """根据悬浮球位置更新 HUD 位置（吸附逻辑）"""
         if not self.parent_ball or not self.isVisible():
             return
@@ -484,10 +689,9 @@ class HolographicHUD(QWidget):
         ball_y = ball.y()
         ball_w = ball.width()
         
-        screen = QApplication.primaryScreen()
-        if not screen:
+        screen_geo = self._get_screen_geo()
+        if screen_geo is None:
             return
-        screen_geo = screen.availableGeometry()
         
         hud_w = self.width()
         hud_h = self.height()
@@ -510,7 +714,8 @@ class HolographicHUD(QWidget):
         if y < screen_geo.y():
             y = screen_geo.y() + 10
         
-        self.move(x, y)
+        if x != self.x() or y != self.y():
+            self.move(x, y)
     
     def clear(self):
         """清空并隐藏 HUD"""
@@ -524,16 +729,22 @@ class HolographicHUD(QWidget):
     
     def _set_html(self, body_html: str):
         """设置完整的 HTML 文档到 QTextBrowser"""
-        full_html = f"""
-        <!DOCTYPE html>
-        <html><head><style>{self._full_css}</style></head>
-        <body>{body_html}</body></html>
-        """
-        self.browser.setHtml(full_html)
+        # 内容与上次相同：文档和尺寸都还在，跳过 HTML 解析和排版
+        if body_html == self._last_body_html:
+            return
+        self._last_body_html = body_html
         
-        # 自适应高度，超过 MAX_HEIGHT 时允许滚动
-        doc = self.browser.document()
+        # 有高亮代码块时换成带 Pygments 高亮 CSS 的样式表（同一对象则不重设）
+        css = _document_css('class="codehilite"' in body_html)
+        if css is not self._doc_css:
+            self._doc_css = css
+            self._doc.setDefaultStyleSheet(css)
+        
+        doc = self._doc
         doc.setTextWidth(self.MAX_WIDTH - 30)  # 减去内边距
+        doc.setHtml(body_html)
+        
+        # 自适应高度，超过 MAX_HEIGHT 时允许滚动
         ideal_height = int(doc.size().height()) + 30  # 加上容器 padding
         height = min(ideal_height, self.MAX_HEIGHT)
         height = max(height, 60)  # 最小高度
@@ -553,7 +764,7 @@ class HolographicHUD(QWidget):
     def _show_at_ball(self):
         """在球旁边显示"""
         self.show()
-        self.update_position()
+        self.update_position(immediate=True)  # 立即定位，避免先在旧位置闪一帧
         self.raise_()  # 确保在最前
     
     def _auto_hide(self):
@@ -561,22 +772,34 @@ class HolographicHUD(QWidget):
         self._hide_timer.stop()
         self.hide()
     
+    def showEvent(self, event):
+        """显示时开始跟随悬浮球"""
+        super().showEvent(event)
+        self._follow_timer.start()
+    
+    def hideEvent(self, event):
+        """隐藏时停止跟随定时器"""
+        self._follow_timer.stop()
+        super().hideEvent(event)
+    
     def paintEvent(self, event):
         """绘制圆角半透明背景"""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
-        # 圆角矩形路径
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, self.width(), self.height(), 12, 12)
+        # 圆角矩形路径（按尺寸缓存，HUD 大小不变时直接复用）
+        size = (self.width(), self.height())
+        if size != self._bg_path_size:
+            self._bg_path = QPainterPath()
+            self._bg_path.addRoundedRect(0, 0, size[0], size[1], 12, 12)
+            self._bg_path_size = size
+        path = self._bg_path
         
         # 半透明黑色背景
-        painter.fillPath(path, QBrush(QColor(10, 15, 20, 220)))
+        painter.fillPath(path, self._bg_brush)
         
         # 赛博青描边
-        pen = QPen(QColor(0, 229, 255, 50))
-        pen.setWidth(1)
-        painter.setPen(pen)
+        painter.setPen(self._border_pen)
         painter.drawPath(path)
     
     def mousePressEvent(self, event):
@@ -10,28 +10,54 @@ import socket
 import threading
 import datetime
 import logging
+import importlib.util
 
-import httpx
 import schedule
 import psutil
-from openai import OpenAI
 
 from .config import ConfigManager, DATA_DIR
 
+# orjson（可选）：更快的 JSON 解析
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger("Fuguang")
 
 
 # ===========================
 # 🧠 潜意识配置
 # ===========================
-last_interaction_time = time.time()
+last_interaction_time = time.monotonic()  # 单调时钟，不受系统改时间影响
 is_running = True
 silent_mode = False  # 静默模式：用户正在操作时禁止主动触发
+_wake = threading.Event()  # 唤醒心跳线程，重新计算下一个截止时间
+
+# 心跳线程最长/最短休眠（秒）：无截止时间时兜底；截止时间已过（静默/无人）时退避
+_MAX_WAIT = 600
+_MIN_WAIT = 10
 
 # ⏱️ 主动对话触发时间从 ConfigManager.HEARTBEAT_IDLE_TIMEOUT 读取
 
+# 情绪标签：[Joy] 之类（字符类匹配，线性扫描无回溯）
+_TAG_RE = re.compile(r"\[([^\]]*)\]")
+_EMOTIONS = frozenset({
+    "Joy", "Angry", "Sorrow", "Fun", "Surprised", "Neutral",
+    "Shy", "Love", "Proud", "Confused", "Apologetic",
+    "Thinking", "Sleeping", "Working", "Wave",
+})
+
+# 发给 Unity 的固定指令，预先编码成 bytes
+_TALK_START = b"talk_start"
+_TALK_END = b"talk_end"
+_EXPR_BYTES = {e: e.encode("utf-8") for e in _EMOTIONS | {"Surprise"}}
+_STRIP_VS16 = str.maketrans("", "", "\ufe0f")  # 去掉 emoji 变体选择符
+
 # AI 客户端（延迟初始化）
 _ai_client = None
+_ai_client_lock = threading.Lock()  # 预热线程和首次心跳可能同时创建客户端
 _udp_socket = None
 
 
@@ -39,31 +65,56 @@ def _get_ai_client():
     """获取 AI 客户端（单例）"""
     global _ai_client
     if _ai_client is None:
-        _ai_client = OpenAI(
-            api_key=ConfigManager.DEEPSEEK_API_KEY,
-            base_url=ConfigManager.DEEPSEEK_BASE_URL,
-            timeout=httpx.Timeout(60.0, connect=10.0)
-        )
+        with _ai_client_lock:
+            if _ai_client is None:
+                # openai/httpx 导入较慢，首次需要时才导入
+                import httpx
+                from openai import OpenAI
+                # 长连接复用：主动搭话间隔很长，保活 5 分钟避免每次重新 TLS 握手；
+                # 装了 h2 时走 HTTP/2
+                http_client = httpx.Client(
+                    http2=importlib.util.find_spec("h2") is not None,
+                    limits=httpx.Limits(
+                        max_connections=4,
+                        max_keepalive_connections=4,
+                        keepalive_expiry=300
+                    ),
+                    timeout=httpx.Timeout(60.0, connect=10.0)
+                )
+                _ai_client = OpenAI(
+                    api_key=ConfigManager.DEEPSEEK_API_KEY,
+                    base_url=ConfigManager.DEEPSEEK_BASE_URL,
+                    http_client=http_client
+                )
     return _ai_client
 
 
+def _prewarm_ai_client():
+    """后台预热 AI 连接（轻量的 /models 请求，建立 TCP/TLS 连接）"""
+    try:
+        _get_ai_client().models.list()
+    except Exception as e:
+        logger.debug(f"AI 连接预热失败（不影响使用）: {e}")
+
+
 def _get_udp_socket():
     """获取 UDP 客户端（单例）"""
     global _udp_socket
     if _udp_socket is None:
         _udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _udp_socket.setblocking(False)  # Unity 卡住时不阻塞心跳线程
     return _udp_socket
 
 
-def _send_to_unity(message: str):
-    """发送消息到 Unity"""
+def _send_to_unity(message):
+    """发送消息到 Unity（str 或预编码好的 bytes）"""
     try:
         sock = _get_udp_socket()
-        message = message.replace('\ufe0f', '')
-        sock.sendto(
-            message.encode('utf-8'),
-            (ConfigManager.UNITY_IP, ConfigManager.UNITY_PORT)
-        )
+        if isinstance(message, str):
+            message = message.translate(_STRIP_VS16).encode('utf-8')
+        sock.sendto(message, (ConfigManager.UNITY_IP, ConfigManager.UNITY_PORT))
+    except BlockingIOError:
+        logger.debug("UDP 发送缓冲区已满，丢弃一条消息")
     except Exception as e:
         logger.error(f"UDP 发送失败: {e}")
 
@@ -71,20 +122,22 @@ def _send_to_unity(message: str):
 def update_interaction(enable_silent=False):
     """每次用户互动时调用，重置无聊计时器"""
     global last_interaction_time, silent_mode
-    last_interaction_time = time.time()
+    last_interaction_time = time.monotonic()
     if enable_silent:
         silent_mode = True
+    _wake.set()
 
 
 def disable_silent_mode():
     """解除静默模式"""
     global silent_mode
     silent_mode = False
+    _wake.set()
 
 
-def get_time_segment() -> str:
-    """判断当前时间段"""
-    h = datetime.datetime.now().hour
+def get_time_segment(now: datetime.datetime = None) -> str:
+    """判断当前时间段（可传入调用方已取好的当前时间）"""
+    h = (now or datetime.datetime.now()).hour
     if 5 <= h < 9: return "清晨"
     if 9 <= h < 12: return "上午"
     if 12 <= h < 14: return "中午"
@@ -93,32 +146,45 @@ def get_time_segment() -> str:
     return "深夜"
 
 
+# 用户画像缓存：(memory.json 的 mtime, 序列化好的画像字符串)
+_profile_cache = (None, "暂无用户画像")
+
+
 def _load_user_profile() -> str:
-    """加载用户画像"""
+    """加载用户画像（文件未修改时直接返回缓存）"""
+    global _profile_cache
     try:
         memory_file = DATA_DIR / "memory.json"
-        if memory_file.exists():
-            with open(memory_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                profile = data.get("user_profile", {})
-                if profile:
-                    return json.dumps(profile, ensure_ascii=False)
-        return "暂无用户画像"
+        try:
+            mtime = memory_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return "暂无用户画像"
+        if mtime == _profile_cache[0]:
+            return _profile_cache[1]
+
+        with open(memory_file, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+        profile = data.get("user_profile", {})
+        result = json.dumps(profile, ensure_ascii=False) if profile else "暂无用户画像"
+        _profile_cache = (mtime, result)
+        return result
     except Exception:
         return "暂无用户画像"
 
 
-def generate_proactive_message() -> str:
+def generate_proactive_message(now: datetime.datetime = None) -> str:
     """
     使用 AI 生成主动搭话内容
     返回带有情绪标签的回复，如：[Joy] 指挥官，在忙什么呢？
     """
-    now = datetime.datetime.now()
+    if now is None:
+        now = datetime.datetime.now()
     current_time = now.strftime("%H:%M")
     current_date = now.strftime("%Y-%m-%d")
-    time_segment = get_time_segment()
+    time_segment = get_time_segment(now)
     user_profile = _load_user_profile()
-    idle_minutes = int((time.time() - last_interaction_time) / 60)
+    idle_minutes = int((time.monotonic() - last_interaction_time) / 60)
     
     prompt = f"""你是沈扶光，指挥官（阿鑫）的虚拟恋人。
 
@@ -166,33 +232,29 @@ def parse_and_speak(text: str):
     """
     from . import voice as fuguang_voice
     
-    # 提取情绪标签
-    expression = "Neutral"
-    tags = re.findall(r"\[(.*?)\]", text)
-    for tag in tags:
-        if tag in ["Joy", "Angry", "Sorrow", "Fun", "Surprised", "Neutral",
-                   "Shy", "Love", "Proud", "Confused", "Apologetic",
-                   "Thinking", "Sleeping", "Working", "Wave"]:
-            expression = tag
-            break
+    # 提取情绪标签（取第一个有效标签）
+    expression = next(
+        (tag for tag in _TAG_RE.findall(text) if tag in _EMOTIONS),
+        "Neutral"
+    )
     
     # 去除所有标签，得到干净文本
-    clean_text = re.sub(r"\[.*?\]", "", text).strip()
+    clean_text = _TAG_RE.sub("", text).strip()
     
     logger.info(f"💓 [主动触发] 表情={expression}, 内容={clean_text}")
     
     # 发送表情到 Unity
-    _send_to_unity(expression)
+    _send_to_unity(_EXPR_BYTES[expression])
     
     # 发送文本到 Unity 文本框显示
     if clean_text:
-        _send_to_unity(f"say:{clean_text}")
+        _send_to_unity(b"say:" + clean_text.translate(_STRIP_VS16).encode('utf-8'))
     
     # TTS 朗读
     if clean_text:
-        _send_to_unity("talk_start")
+        _send_to_unity(_TALK_START)
         fuguang_voice.speak(clean_text)
-        _send_to_unity("talk_end")
+        _send_to_unity(_TALK_END)
 
 
 # ===========================
@@ -204,7 +266,7 @@ def _remind_drink_water():
     from . import voice as fuguang_voice
     if not silent_mode:
         logger.info("⏰ [生物钟] 触发喝水提醒")
-        _send_to_unity("Joy")
+        _send_to_unity(_EXPR_BYTES["Joy"])
         fuguang_voice.speak("指挥官，工作辛苦了，记得喝口水哦~")
 
 def _remind_take_rest():
@@ -212,7 +274,7 @@ def _remind_take_rest():
     from . import voice as fuguang_voice
     if not silent_mode:
         logger.info("⏰ [生物钟] 触发久坐提醒")
-        _send_to_unity("Sorrow")
+        _send_to_unity(_EXPR_BYTES["Sorrow"])
         fuguang_voice.speak("指挥官，坐了好一会儿了，起来活动活动吧？眼睛也要休息一下~")
 
 def _check_system_health():
@@ -228,13 +290,13 @@ def _check_system_health():
         # CPU 过高报警
         if cpu_usage > ConfigManager.BIOCLOCK_CPU_WARNING_THRESHOLD:
             logger.warning(f"⚠️ [生物钟] CPU 使用率过高: {cpu_usage}%")
-            _send_to_unity("Surprise")
+            _send_to_unity(_EXPR_BYTES["Surprise"])
             fuguang_voice.speak(f"指挥官，注意！CPU 占用率高达 {int(cpu_usage)} 个百分点，建议检查一下后台程序。")
         
         # 内存不足报警 (< 15%)
         if memory.percent > 85:
             logger.warning(f"⚠️ [生物钟] 内存使用率过高: {memory.percent}%")
-            _send_to_unity("Sorrow")
+            _send_to_unity(_EXPR_BYTES["Sorrow"])
             fuguang_voice.speak(f"指挥官，内存快溢出了，剩余只有 {100 - int(memory.percent)} 个百分点，要不关掉几个程序？")
             
     except Exception as e:
@@ -268,6 +330,9 @@ def start_heartbeat():
     # 注册定时任务
     _register_scheduled_tasks()
     
+    # 预热 AI 连接，首次主动搭话不用再等握手
+    threading.Thread(target=_prewarm_ai_client, daemon=True).start()
+    
     # 启动后台线程
     thread = threading.Thread(target=_life_cycle, daemon=True)
     thread.start()
@@ -291,10 +356,12 @@ def _life_cycle():
     # 其他时段不说话，由 NervousSystem.run() 里的 "指挥官，我上线了" 统一问候
     # 避免重复说两句话
 
-    # 2. 循环监测
+    # 2. 事件驱动：睡到下一个截止时间（空闲触发 / 01:00 / 定时任务），互动时被唤醒
+    last_bedtime_date = None
     while is_running:
-        now = time.time()
-        idle_seconds = now - last_interaction_time
+        _wake.clear()
+        now_dt = datetime.datetime.now()
+        idle_seconds = time.monotonic() - last_interaction_time
         
         # === 触发逻辑：AI 主动搭话 ===
         if idle_seconds > ConfigManager.HEARTBEAT_IDLE_TIMEOUT and not silent_mode:
@@ -307,29 +374,47 @@ def _life_cycle():
                     if not fuguang_camera.is_user_present():
                         logger.info("🚫 座位无人，跳过主动对话")
                         # 不重置计时器，用户一回来就会再次检测
-                        time.sleep(10)
+                        _wake.wait(_MIN_WAIT)
                         continue
                 except Exception as e:
                     logger.warning(f"摄像头检测失败，跳过: {e}")
             
             # 使用 AI 生成内容
-            message = generate_proactive_message()
+            message = generate_proactive_message(now_dt)
             parse_and_speak(message)
             
             # 重置计时器，避免复读机
             update_interaction()
         
         # === 触发逻辑：深夜劝睡 ===
-        current_hour = datetime.datetime.now().hour
-        current_minute = datetime.datetime.now().minute
-        if current_hour == 1 and current_minute == 0 and not silent_mode:
+        if (now_dt.hour == 1 and now_dt.minute == 0 and not silent_mode
+                and last_bedtime_date != now_dt.date()):
             if idle_seconds < 1800:  # 半小时内活跃过
-                _send_to_unity("Sorrow")
+                last_bedtime_date = now_dt.date()
+                _send_to_unity(_EXPR_BYTES["Sorrow"])
                 fuguang_voice.speak("指挥官，都一点了。强制休息指令... 开玩笑的，但真的该睡了。")
-                time.sleep(60)
 
         # === [新增] 执行定时任务 (BioClock) ===
         schedule.run_pending()
 
-        # 每 10 秒检查一次状态
-        time.sleep(10)
+        _wake.wait(_next_wait())
+
+
+def _next_wait() -> float:
+    """距离下一个需要心跳处理的时间点还有多少秒"""
+    now_dt = datetime.datetime.now()
+
+    next_1am = now_dt.replace(hour=1, minute=0, second=0, microsecond=0)
+    if next_1am <= now_dt:
+        next_1am += datetime.timedelta(days=1)
+
+    deadlines = [(next_1am - now_dt).total_seconds()]
+    idle_deadline = (last_interaction_time + ConfigManager.HEARTBEAT_IDLE_TIMEOUT
+                     - time.monotonic())
+    # 已过期说明被静默模式/无人挡住，退避后再检查
+    deadlines.append(idle_deadline if idle_deadline > 0 else _MIN_WAIT)
+    job_wait = schedule.idle_seconds()
+    if job_wait is not None:
+        deadlines.append(max(job_wait, 0))
+
+    return min(min(deadlines), _MAX_WAIT)
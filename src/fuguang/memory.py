@@ -1,10 +1,21 @@
 import json
 import os
 import time
+import sqlite3
 import logging
-import jieba  # 需要安装: pip install jieba (用于提取关键词)
+import functools
+import threading
+import numpy as np
+from collections import Counter, defaultdict
 from datetime import datetime
-from .config import LONG_TERM_MEMORY_FILE
+from .config import LONG_TERM_MEMORY_FILE, LONG_TERM_MEMORY_LOG, LONG_TERM_MEMORY_DB
+
+# orjson（可选）：更快的 JSON 解析
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # [修复C-3] 添加缺失的 logger 定义
 logger = logging.getLogger("Fuguang")
@@ -12,31 +23,238 @@ logger = logging.getLogger("Fuguang")
 # MEMORY_DB defined in config
 
 # 停用词列表（过滤无意义的词）
-STOP_WORDS = set([
+STOP_WORDS = frozenset([
     '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一',
     '一个', '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没有',
     '看', '好', '自己', '这', '那', '里', '啊', '吧', '呢', '吗'
 ])
 
+# 数据库版本（PRAGMA user_version）：>= 1 表示旧版 JSON/JSONL 已迁移过
+_SCHEMA_VERSION = 1
+
+_jieba = None
+_jieba_lock = threading.Lock()
+
+
+def _get_jieba():
+    """获取分词器（首次调用时导入；优先 jieba_fast，C 扩展，API 相同，回退 jieba）"""
+    global _jieba
+    if _jieba is None:
+        with _jieba_lock:
+            if _jieba is None:
+                try:
+                    import jieba_fast as jieba
+                except ImportError:
+                    import jieba  # 需要安装: pip install jieba (用于提取关键词)
+                _jieba = jieba
+    return _jieba
+
+
+@functools.lru_cache(maxsize=512)
+def _tokenize(text: str) -> tuple:
+    """分词（带缓存，同一句查询不再重复切词；关闭 HMM 新词发现，省掉 Viterbi 计算）"""
+    return tuple(_get_jieba().cut(text, HMM=False))
+
+
+def _grams(word: str):
+    """倒排索引的键：相邻二元组；单字词就是它本身"""
+    if len(word) < 2:
+        return (word,)
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+def _prewarm_jieba():
+    """导入 jieba 并加载词典（几百毫秒），放在后台线程，不卡在启动和语音交互路径上"""
+    try:
+        _get_jieba().initialize()
+    except Exception as e:
+        logger.warning(f"jieba 预热失败: {e}")
+
+
+
+def _loads(line: bytes):
+    """解析一行 JSON（orjson.JSONDecodeError 是 ValueError 的子类）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def _dumps(obj) -> str:
+    """序列化成 JSON 字符串（中文不转义）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+
 class MemorySystem:
+    """
+    长期记忆（关键词检索）
+
+    持久化在 SQLite（WAL 模式），每条记忆一次 INSERT，不再整体重写文件；
+    检索打分用内存里的倒排索引
+
+    Tables:
+        memories: seq, id, date, content(UNIQUE), keywords(JSON), importance
+    """
+
     def __init__(self):
+        self._local = threading.local()  # 线程本地连接
+        self._init_db()
         self.memories = self._load_db()
+        self._content_seen = {mem.get("content") for mem in self.memories}  # O(1) 去重
+        threading.Thread(target=_prewarm_jieba, daemon=True, name="jieba-init").start()
+        # 检索索引（首次检索时构建，之后随 add_memory 增量更新）
+        self._kw_counts = None   # 每条记忆的 {关键词: 次数}
+        self._gram_index = None  # 倒排索引：关键词的二元组（单字关键词用单字）→ 记忆下标集合
+        self._weights = None     # 每条记忆的重要度权重 (1 + importance * 0.2)，与 memories 对齐
+
+    def _build_index(self):
+        """为已有记忆构建检索索引"""
+        self._kw_counts = []
+        self._gram_index = defaultdict(set)
+        for mem in self.memories:
+            self._index_memory(mem)
+        self._weights = None
+
+    def _index_memory(self, mem):
+        """把一条记忆加入检索索引"""
+        idx = len(self._kw_counts)
+        counts = Counter(mem.get("keywords", []))
+        self._kw_counts.append(counts)
+        for keyword in counts:
+            for gram in _grams(keyword):
+                self._gram_index[gram].add(idx)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接"""
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = sqlite3.connect(LONG_TERM_MEMORY_DB)
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+        return self._local.conn
+
+    def _init_db(self):
+        """初始化数据库表"""
+        conn = self._get_conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS memories (
+                seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+                id          INTEGER NOT NULL,
+                date        TEXT NOT NULL,
+                content     TEXT NOT NULL UNIQUE,
+                keywords    TEXT NOT NULL DEFAULT '[]',
+                importance  INTEGER NOT NULL DEFAULT 1
+            );
+        """)
+        conn.commit()
 
     def _load_db(self):
-        """加载记忆数据库"""
-        if not LONG_TERM_MEMORY_FILE.exists():
+        """加载记忆数据库（首次使用时从旧版 JSONL 日志 / JSON 文件迁移）"""
+        conn = self._get_conn()
+        try:
+            rows = conn.execute(
+                "SELECT id, date, content, keywords, importance FROM memories ORDER BY seq"
+            ).fetchall()
+            migrated = conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION
+        except sqlite3.Error as e:
+            logger.warning(f"记忆数据库读取失败: {e}")
             return []
+        if not migrated:
+            if not rows:
+                return self._migrate_legacy_db()
+            # 迁移标记加入前就已有数据的库：记一下，以后删空了也不再重新导入旧文件
+            self._mark_migrated(conn)
+        return [
+            {
+                "id": mem_id,
+                "date": date,
+                "content": content,
+                "keywords": _loads(keywords),
+                "importance": importance
+            }
+            for mem_id, date, content, keywords, importance in rows
+        ]
+
+    def _read_legacy_db(self):
+        """读取旧版存储：JSONL 日志优先，其次整体 JSON"""
+        if LONG_TERM_MEMORY_LOG.exists():
+            memories = []
+            with open(LONG_TERM_MEMORY_LOG, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        memories.append(_loads(line))
+                    except ValueError:
+                        # 写到一半被打断的行，跳过
+                        logger.warning(f"记忆日志存在损坏的行，已跳过: {line[:50]!r}")
+            return memories
+        if LONG_TERM_MEMORY_FILE.exists():
+            with open(LONG_TERM_MEMORY_FILE, 'rb') as f:
+                return _loads(f.read())
+        return []
+
+    def _migrate_legacy_db(self):
+        """把旧版存储导入 SQLite（旧文件保留不动）"""
         try:
-            with open(LONG_TERM_MEMORY_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            legacy = self._read_legacy_db()
         except Exception as e:
             logger.warning(f"记忆文件读取失败: {e}")
             return []
+        conn = self._get_conn()
+        if not legacy:
+            self._mark_migrated(conn)
+            return []
+
+        memories = []
+        seen = set()
+        for mem in legacy:
+            content = mem.get("content")
+            if content and content not in seen:
+                seen.add(content)
+                memories.append(mem)
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO memories (id, date, content, keywords, importance) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [self._to_row(mem) for mem in memories]
+            )
+        self._mark_migrated(conn)
+        logger.info(f"🧠 [海马体] 已迁移 {len(memories)} 条记忆到 {LONG_TERM_MEMORY_DB.name}")
+        return memories
 
-    def _save_db(self):
-        """保存记忆数据库"""
-        with open(LONG_TERM_MEMORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.memories, f, ensure_ascii=False, indent=4)
+    @staticmethod
+    def _mark_migrated(conn):
+        """记录旧版存储已处理过（PRAGMA user_version），之后打开不再迁移"""
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.commit()
+
+    @staticmethod
+    def _to_row(mem):
+        """记忆原子 → 数据库行"""
+        return (
+            mem.get("id", 0),
+            mem.get("date", ""),
+            mem["content"],
+            _dumps(mem.get("keywords", [])),
+            mem.get("importance", 1)
+        )
+
+    def _insert_db(self, memory_atom):
+        """写入一条记忆（单条 INSERT，不再整体重写文件）"""
+        conn = self._get_conn()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO memories (id, date, content, keywords, importance) "
+                "VALUES (?, ?, ?, ?, ?)",
+                self._to_row(memory_atom)
+            )
+
+    def close(self):
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     def add_memory(self, content, importance=1):
         """
@@ -45,14 +263,12 @@ class MemorySystem:
         importance: 重要程度 (1-5, 5为最高级，永不删除)
         """
         # 🔥 去重检查：避免重复记忆
-        for mem in self.memories:
-            if mem["content"] == content:
-                print(f"⚠️ [海马体] 记忆已存在，跳过: {content}")
-                return
+        if content in self._content_seen:
+            print(f"⚠️ [海马体] 记忆已存在，跳过: {content}")
+            return
         
         # 1. 自动提取关键词（过滤停用词）
-        raw_keywords = jieba.cut(content)
-        keywords = [w for w in raw_keywords if w not in STOP_WORDS and len(w) > 1]
+        keywords = [w for w in _tokenize(content) if w not in STOP_WORDS and len(w) > 1]
         
         # 2. 构建记忆原子 (Memory Atom)
         memory_atom = {
@@ -64,7 +280,11 @@ class MemorySystem:
         }
         
         self.memories.append(memory_atom)
-        self._save_db()
+        self._content_seen.add(content)
+        if self._kw_counts is not None:
+            self._index_memory(memory_atom)
+            self._weights = None  # 下次检索时重建
+        self._insert_db(memory_atom)
         print(f"🧠 [海马体] 已固化记忆: {content} (关键词: {keywords})")
 
     def search_memory(self, query_text):
@@ -73,36 +293,55 @@ class MemorySystem:
         原理：看 query_text 里有多少词命中记忆的 keywords
         升级：加入 importance 权重 + 子串匹配，提高召回率
         """
-        query_words = list(jieba.cut(query_text))
-        results = []
+        query_words = [w for w in _tokenize(query_text) if len(w) >= 2]  # 跳过单字词
+        if not query_words:
+            return []
+        if self._kw_counts is None:
+            self._build_index()
 
-        for mem in self.memories:
-            mem_keywords = mem.get("keywords", [])
-            if not mem_keywords:
-                continue
-            
+        # 精确匹配和子串包含都意味着较短一方的首个二元组出现在另一方里
+        # （单字关键词则是该字出现在查询词里），按倒排索引取并集，
+        # 只给这些候选记忆打分，其余记忆直接跳过
+        gram_index = self._gram_index
+        candidates = set()
+        for query_word in query_words:
+            for gram in _grams(query_word):
+                candidates.update(gram_index.get(gram, ()))
+            for ch in query_word:
+                candidates.update(gram_index.get(ch, ()))
+
+        cand_idx = []
+        cand_scores = []
+        for idx in candidates:
             # 计算匹配度（两种匹配方式）
+            kw_counts = self._kw_counts[idx]
             match_score = 0
             for query_word in query_words:
-                if len(query_word) < 2:  # 跳过单字词
-                    continue
-                for keyword in mem_keywords:
-                    # 方式1: 精确匹配
-                    if query_word == keyword:
-                        match_score += 2
-                    # 方式2: 子串包含（'驾照' in '考驾照' 或反向）
-                    elif query_word in keyword or keyword in query_word:
-                        match_score += 1
-            
+                # 方式1: 精确匹配（哈希查找）
+                match_score += 2 * kw_counts.get(query_word, 0)
+                # 方式2: 子串包含（'驾照' in '考驾照' 或反向）；等长的子串只能是相等，已在上面算过
+                n = len(query_word)
+                for keyword, count in kw_counts.items():
+                    if len(keyword) != n and (query_word in keyword or keyword in query_word):
+                        match_score += count
             if match_score > 0:
-                # 重要度作为权重因子 (1-5 → 1.0-2.0)
-                importance = mem.get("importance", 1)
-                weighted_score = match_score * (1 + importance * 0.2)
-                results.append((weighted_score, mem["content"]))
-
-        # 按加权分数降序排列，取前 3 条
-        results.sort(key=lambda x: x[0], reverse=True)
-        return [r[1] for r in results[:3]]
+                cand_idx.append(idx)
+                cand_scores.append(match_score)
+        if not cand_idx:
+            return []
+
+        # 重要度作为权重因子 (1-5 → 1.0-2.0)，加权和排序交给 numpy 批量完成
+        if self._weights is None:
+            self._weights = np.fromiter(
+                (1 + mem.get("importance", 1) * 0.2 for mem in self.memories),
+                dtype=np.float64, count=len(self.memories)
+            )
+        idx_arr = np.array(cand_idx, dtype=np.intp)
+        weighted = np.array(cand_scores, dtype=np.float64) * self._weights[idx_arr]
+
+        # 按加权分数降序排列（同分时先存的在前），取前 3 条
+        top = np.lexsort((idx_arr, -weighted))[:3]
+        return [self.memories[i]["content"] for i in idx_arr[top]]
 
 # =======================
 # 🧪 测试区 (Unit Test)
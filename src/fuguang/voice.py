@@ -3,6 +3,8 @@
 特点：真正边收边播，音频振幅驱动 VTS 嘴巴动作，支持 edge-tts 降级
 """
 import asyncio
+import atexit
+import hashlib
 import re
 import struct
 import math
@@ -13,6 +15,8 @@ import numpy as np
 import time
 import os
 import threading
+import uuid
+from collections import OrderedDict
 import keyboard
 import logging
 from .config import DATA_DIR, ConfigManager
@@ -22,14 +26,43 @@ from pathlib import Path
 
 logger = logging.getLogger("Fuguang.Voice")
 
-# 临时音频文件 (仅 edge-tts 降级使用)
-TEMP_AUDIO = DATA_DIR / "fuguang_temp.mp3"
+# edge-tts 音频缓存 (仅降级使用)：同一句话 + 同一音色只合成一次
+TTS_CACHE_DIR = DATA_DIR / "tts_cache"
+TTS_CACHE_MAX_FILES = 200  # 超出后按最近使用时间淘汰
+EDGE_TTS_BITRATE = 48000   # edge-tts 默认输出 48kbps 单声道 mp3，用于按文件大小估算时长
+EDGE_TTS_CONCURRENCY = 4   # 多句回复同时合成的最大句数
+TTS_SOUND_CACHE_MAX = 32   # 内存里保留的已解码语音条数（常用短句免去重复解码）
+
+# 句末切分（保留标点）：中文句号/问号/叹号；英文句点后须有空白，避免切开小数
+# 连续的句末标点（！！、?!）及紧跟的右引号/右括号整体留在句尾，不单独成句
+_SENTENCE_SPLIT_RE = re.compile(
+    r'(?<=[。！？!?])(?![。！？!?”’」』）)])\s*'
+    r'|(?<=[。！？!?][”’」』）)])(?![”’」』）)])\s*'
+    r'|(?<=\.)\s+'
+)
+_WORD_RE = re.compile(r'\w')
+
+# 已解码的语音：缓存文件路径 → pygame.mixer.Sound（LRU，只在持有 _speak_lock 时访问）
+_sound_cache = OrderedDict()
 
 # 🔥 线程锁（避免多线程同时播放语音冲突）
 _speak_lock = threading.Lock()
 
 # 🔥 全局打断标志
 _interrupted = False
+# 打断事件：右 Ctrl 按键钩子 / stop_speaking 置位，每次 speak 开始时清除
+_stop_event = threading.Event()
+
+
+def _on_interrupt_key(_event):
+    """右 Ctrl 按下：请求打断当前语音（钩子回调，不再轮询按键状态）"""
+    _stop_event.set()
+
+
+try:
+    keyboard.on_press_key('right ctrl', _on_interrupt_key)
+except Exception as e:
+    logger.warning(f"⚠️ 打断热键注册失败（右 Ctrl 打断不可用）: {e}")
 
 # ================================================================
 # SiliconFlow CosyVoice2 配置
@@ -119,7 +152,7 @@ def _speak_cosyvoice_pcm(text: str, api_key: str) -> bool:
                 logger.info("⏹️ [TTS] PCM 流式播放被打断")
                 break
 
-            if keyboard.is_pressed('right ctrl'):
+            if _stop_event.is_set():
                 _interrupted = True
                 print("⏹️ 语音被用户打断")
                 break
@@ -180,55 +213,132 @@ def _speak_cosyvoice_pcm(text: str, api_key: str) -> bool:
             on_mouth_update(0.0)
 
 
-async def _generate_audio_edge_tts(text: str, voice: str = "zh-CN-XiaoyiNeural"):
-    """降级方案：edge-tts 合成音频文件"""
+def _tts_cache_path(text: str, voice: str) -> Path:
+    """缓存文件路径：按 (音色, 文本) 哈希命名"""
+    digest = hashlib.blake2b(f"{voice}|{text}".encode("utf-8"), digest_size=16).hexdigest()
+    return TTS_CACHE_DIR / f"{digest}.mp3"
+
+
+def _evict_tts_cache():
+    """缓存文件超出上限时，删掉最久没用过的"""
+    try:
+        # 进程崩溃等情况留下的临时文件（正常流程在合成结束时就已删掉）
+        stale = time.time() - 600
+        for part in TTS_CACHE_DIR.glob("*.part"):
+            try:
+                if part.stat().st_mtime < stale:
+                    part.unlink()
+            except OSError:
+                pass
+        files = list(TTS_CACHE_DIR.glob("*.mp3"))
+        if len(files) <= TTS_CACHE_MAX_FILES:
+            return
+        files.sort(key=lambda f: f.stat().st_mtime)
+        for f in files[:len(files) - TTS_CACHE_MAX_FILES]:
+            try:
+                f.unlink()
+            except OSError:
+                pass  # 可能正被 pygame 占用，下次再删
+    except Exception as e:
+        logger.debug(f"TTS 缓存清理失败: {e}")
+
+
+async def _generate_audio_edge_tts(text: str, path: Path, voice: str = "zh-CN-XiaoyiNeural") -> bool:
+    """降级方案：edge-tts 流式合成音频文件（先写临时文件，完整后再放进缓存）
+
+    音频块边收边写盘；合成途中被打断就立即停止，不再等整段合成完。
+    Returns True if the file is complete, False if interrupted.
+    """
+    global _interrupted
     import edge_tts
-    TEMP_AUDIO.parent.mkdir(parents=True, exist_ok=True)
-    communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(str(TEMP_AUDIO))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 每次合成用独立的临时文件，同一句话的并发/残留合成不会写进同一个文件
+    tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.part")
+    try:
+        communicate = edge_tts.Communicate(text, voice)
+        with open(tmp_path, "wb") as f:
+            async for chunk in communicate.stream():
+                if _interrupted or _stop_event.is_set():
+                    _interrupted = True
+                    logger.info("⏹️ [TTS] edge-tts 合成被打断")
+                    return False
+                if chunk["type"] == "audio":
+                    f.write(chunk["data"])
+        os.replace(tmp_path, path)
+    finally:
+        # 异常、取消或打断时清掉临时文件（已 replace 的不存在，忽略）
+        tmp_path.unlink(missing_ok=True)
     logger.info("✅ edge-tts 音频生成完成 (降级模式)")
+    return True
 
 
-def _play_with_pygame():
+def _get_sound(path: Path):
+    """取解码好的 pygame Sound（mp3 只解码一次，常用短句直接复用内存里的 PCM）
+
+    只缓存持久 tts_cache 里的文件；其他一次性文件不值得整段解码并占着内存，
+    和解码失败（如 SDL_mixer 不支持 mp3）一样返回 None，由调用方回退到 mixer.music 流式播放
+    """
+    if path.parent != TTS_CACHE_DIR:
+        return None
+    key = str(path)
+    sound = _sound_cache.get(key)
+    if sound is not None:
+        _sound_cache.move_to_end(key)
+        return sound
+    try:
+        sound = pygame.mixer.Sound(key)
+    except Exception as e:
+        logger.debug(f"pygame Sound 解码失败，改用流式播放: {e}")
+        return None
+    _sound_cache[key] = sound
+    if len(_sound_cache) > TTS_SOUND_CACHE_MAX:
+        _sound_cache.popitem(last=False)
+    return sound
+
+
+def _play_with_pygame(path: Path):
     """用 pygame 播放 mp3 文件 (edge-tts 降级路径)"""
     global _interrupted
 
+    channel = None
     try:
-        pygame.mixer.music.load(str(TEMP_AUDIO))
-        pygame.mixer.music.play()
+        sound = _get_sound(path)
+        if sound is not None:
+            channel = sound.play()
+        if channel is not None:
+            # 已解码的 PCM 直接交给混音器，不再读文件、边播边解码
+            expected = sound.get_length()
+            is_busy = channel.get_busy
+        else:
+            pygame.mixer.music.load(str(path))
+            pygame.mixer.music.play()
+            # 按文件大小估算时长
+            expected = path.stat().st_size * 8 / EDGE_TTS_BITRATE
+            is_busy = pygame.mixer.music.get_busy
 
         # 嘴巴固定张开 (降级模式没有 RMS，用固定值)
         if on_mouth_update:
             on_mouth_update(0.8)
 
-        while pygame.mixer.music.get_busy():
-            if keyboard.is_pressed('right ctrl'):
-                print("⏹️ 语音被用户打断")
-                pygame.mixer.music.stop()
-                _interrupted = True
-                break
-            time.sleep(0.05)
-
-        # 释放资源
-        try:
-            pygame.mixer.music.stop()
-            pygame.mixer.music.unload()
-            time.sleep(0.2)
-        except Exception:
-            pass
+        # 预计时长内直接阻塞等待打断事件，快结束时再短间隔确认播放状态
+        if not _stop_event.wait(expected):
+            while is_busy() and not _stop_event.wait(0.05):
+                pass
 
-        # 清理临时文件
-        try:
-            if TEMP_AUDIO.exists():
-                os.remove(TEMP_AUDIO)
-        except Exception:
-            pass
+        if _stop_event.is_set():
+            print("⏹️ 语音被用户打断")
+            _interrupted = True
 
     except Exception as e:
         print(f"❌ pygame 播放失败: {e}")
     finally:
+        # 停止并释放资源（缓存文件不再删除，无需等待句柄释放）
         try:
-            pygame.mixer.music.unload()
+            if channel is not None:
+                channel.stop()
+            else:
+                pygame.mixer.music.stop()
+                pygame.mixer.music.unload()
         except Exception:
             pass
         # 关闭嘴巴
@@ -236,13 +346,117 @@ def _play_with_pygame():
             on_mouth_update(0.0)
 
 
-def _run_async(coro):
-    """线程安全地运行异步协程"""
-    loop = asyncio.new_event_loop()
+def _split_sentences(text: str) -> list:
+    """按句切分，丢掉空句；只有标点的片段并回上一句（单独合成拿不到音频）"""
+    sentences = []
+    for s in _SENTENCE_SPLIT_RE.split(text):
+        if not s.strip():
+            continue
+        if sentences and not _WORD_RE.search(s):
+            sentences[-1] += s
+        else:
+            sentences.append(s)
+    return sentences
+
+
+async def _synth_pending(pending: dict, voice: str):
+    """并发合成缺失的句子；每句完成（或失败/被打断/取消）后置位对应事件
+
+    任何一句发现被打断，就取消其余还在排队或合成中的句子
+    """
+    sem = asyncio.Semaphore(EDGE_TTS_CONCURRENCY)
+    tasks = []
+
+    async def synth_one(path, sentence, done):
+        try:
+            async with sem:
+                if _interrupted or _stop_event.is_set():
+                    completed = False
+                else:
+                    completed = await _generate_audio_edge_tts(sentence, path, voice=voice)
+            if not completed:
+                current = asyncio.current_task()
+                for task in tasks:
+                    if task is not current:
+                        task.cancel()
+        except Exception as e:
+            logger.warning(f"🎭 [TTS] edge-tts 合成失败: {e}")
+        finally:
+            done.set()
+
+    tasks.extend(
+        asyncio.ensure_future(synth_one(path, sentence, done))
+        for path, (sentence, done) in pending.items()
+    )
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _speak_edge_tts(text: str, voice: str):
+    """edge-tts 降级：逐句并发合成，按顺序播放，第一句合成完就开始播"""
+    items = [(sentence, _tts_cache_path(sentence, voice)) for sentence in _split_sentences(text)]
+
+    # 缓存里没有的句子交给常驻事件循环并发合成
+    pending = {}
+    for sentence, path in items:
+        if path.exists():
+            os.utime(path)  # 更新使用时间（LRU）
+        elif path not in pending:
+            pending[path] = (sentence, threading.Event())
+    future = _submit_async(_synth_pending(pending, voice)) if pending else None
+
     try:
-        return loop.run_until_complete(coro)
+        for sentence, path in items:
+            if path in pending:
+                # 等这句合成完，期间也响应打断
+                done = pending[path][1]
+                while not done.wait(0.05) and not _stop_event.is_set():
+                    pass
+            if _interrupted or _stop_event.is_set():
+                break
+            if not path.exists():
+                logger.warning(f"🎭 [TTS] 跳过未能合成的句子: {sentence}")
+                continue
+            _play_with_pygame(path)
     finally:
-        loop.close()
+        if future is not None:
+            # 打断/异常退出时取消还没合成完的句子，不让它们在下一次 speak 期间继续跑；
+            # 该 Future 来自 run_coroutine_threadsafe，cancel() 会经 call_soon_threadsafe 取消事件循环里的任务
+            future.cancel()
+            _evict_tts_cache()
+
+
+_async_loop = None
+_async_loop_lock = threading.Lock()
+
+
+def _get_async_loop():
+    """获取常驻的事件循环（后台线程里一直运行，所有 TTS 协程共用，不再每次创建/关闭）"""
+    global _async_loop
+    if _async_loop is None:
+        with _async_loop_lock:
+            if _async_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, daemon=True, name="tts-async-loop"
+                ).start()
+                atexit.register(_close_async_loop, loop)
+                _async_loop = loop
+    return _async_loop
+
+
+def _close_async_loop(loop):
+    """进程退出时停止并关闭事件循环"""
+    loop.call_soon_threadsafe(loop.stop)
+    for _ in range(20):
+        if not loop.is_running():
+            loop.close()
+            break
+        time.sleep(0.01)
+
+
+def _submit_async(coro):
+    """把协程提交到常驻事件循环（线程安全），返回 concurrent.futures.Future"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_async_loop())
 
 
 def was_interrupted():
@@ -256,23 +470,34 @@ def clear_interrupt():
     _interrupted = False
 
 
-def _clean_markdown(text: str) -> str:
-    """清理 Markdown 格式符号，避免 TTS 朗读星号、井号等"""
+# Markdown 清理规则（模块加载时编译一次，按顺序依次替换）
+_MD_CLEAN_PATTERNS = [
     # 粗体 **text** 或 __text__
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'__(.+?)__', r'\1', text)
+    (re.compile(r'\*\*(.+?)\*\*'), r'\1'),
+    (re.compile(r'__(.+?)__'), r'\1'),
     # 斜体 *text* 或 _text_（单个）
-    text = re.sub(r'(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)', r'\1', text)
+    (re.compile(r'(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)'), r'\1'),
     # 行内代码 `code`
-    text = re.sub(r'`(.+?)`', r'\1', text)
+    (re.compile(r'`(.+?)`'), r'\1'),
     # 标题 # ## ### 等
-    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
+    (re.compile(r'^#{1,6}\s+', re.MULTILINE), ''),
     # 无序列表 - 或 * 开头
-    text = re.sub(r'^\s*[-*+]\s+', '', text, flags=re.MULTILINE)
+    (re.compile(r'^\s*[-*+]\s+', re.MULTILINE), ''),
     # 有序列表 1. 2. 等
-    text = re.sub(r'^\s*\d+\.\s+', '', text, flags=re.MULTILINE)
+    (re.compile(r'^\s*\d+\.\s+', re.MULTILINE), ''),
     # 链接 [text](url) -> text
-    text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)
+    (re.compile(r'\[(.+?)\]\(.+?\)'), r'\1'),
+]
+# 可能需要清理的字符；一个都没有时（大多数口语回复）直接跳过
+_MD_CLEAN_TRIGGER = re.compile(r'[*_`#\[]|^\s*(?:[-+]|\d+\.)\s', re.MULTILINE)
+
+
+def _clean_markdown(text: str) -> str:
+    """清理 Markdown 格式符号，避免 TTS 朗读星号、井号等"""
+    if not _MD_CLEAN_TRIGGER.search(text):
+        return text.strip()
+    for pattern, repl in _MD_CLEAN_PATTERNS:
+        text = pattern.sub(repl, text)
     # 残留的多余星号
     text = text.replace('*', '')
     # 代码块标记 ```
@@ -284,6 +509,7 @@ def stop_speaking():
     """强制停止当前语音播放"""
     global _interrupted
     _interrupted = True
+    _stop_event.set()
     try:
         pygame.mixer.music.stop()
     except Exception:
@@ -309,6 +535,7 @@ def speak(text, voice="zh-CN-XiaoyiNeural"):
 
         global _interrupted
         _interrupted = False
+        _stop_event.clear()
 
         # 优先尝试 CosyVoice2 PCM 流式播放
         api_key = ConfigManager.SILICONFLOW_API_KEY
@@ -322,8 +549,7 @@ def speak(text, voice="zh-CN-XiaoyiNeural"):
         # 降级：edge-tts + pygame
         if not played and not _interrupted:
             try:
-                _run_async(_generate_audio_edge_tts(text, voice=voice))
-                _play_with_pygame()
+                _speak_edge_tts(text, voice)
             except Exception as e:
                 print(f"❌ 语音合成失败: {e}")
 
@@ -4,6 +4,7 @@
 """
 import cv2
 import sys
+import threading
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
@@ -11,13 +12,89 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 
+class _LatestFrameReader:
+    """后台线程持续读取摄像头，只保留最新一帧（显示慢时不会积压旧帧）"""
+
+    def __init__(self, cap):
+        self._cap = cap
+        self._lock = threading.Lock()
+        self._frame = None
+        self._ok = True
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                ret, frame = self._cap.read()
+                with self._lock:
+                    self._ok = ret
+                    if ret:
+                        self._frame = frame
+                if not ret:
+                    break
+        finally:
+            # 由读取线程自己释放：不会在 cap.read() 还阻塞时被别的线程释放掉
+            self._cap.release()
+
+    def read(self):
+        """返回 (是否正常, 最新一帧)，还没有新帧时帧为 None"""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            return self._ok, frame
+
+    def stop(self):
+        """通知读取线程退出（摄像头由读取线程退出时释放）"""
+        self._stopped.set()
+        self._thread.join(timeout=1)
+
+
+def _open_camera():
+    """打开摄像头（Windows 用 DirectShow 后端，打开更快）"""
+    if sys.platform == "win32":
+        cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    else:
+        cap = cv2.VideoCapture(0)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # 不缓存旧帧，预览延迟更低
+    return cap
+
+
+def _draw_overlay(frame):
+    """在预览帧上画辅助对准框和提示（只用于显示，保存的照片不带这些）"""
+    height, width = frame.shape[:2]
+    center_x, center_y = width // 2, height // 2
+    
+    # 绿色矩形框
+    cv2.rectangle(
+        frame, 
+        (center_x - 150, center_y - 200), 
+        (center_x + 150, center_y + 200), 
+        (0, 255, 0), 2
+    )
+    
+    # 标签文字
+    cv2.putText(
+        frame, "Commander", 
+        (center_x - 70, center_y - 210), 
+        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2
+    )
+    
+    # 操作提示
+    cv2.putText(
+        frame, "Press [S] to Save, [Q] to Quit", 
+        (10, height - 20), 
+        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2
+    )
+
+
 def capture_commander_face():
     """捕获指挥官照片并保存到人脸数据库"""
     # 1. 准备目录 (使用绝对路径)
     face_db_dir = PROJECT_ROOT / "data" / "face_db"
     face_db_dir.mkdir(parents=True, exist_ok=True)
     
-    cap = cv2.VideoCapture(0)
+    cap = _open_camera()
     if not cap.isOpened():
         print("❌ 无法打开摄像头")
         return
@@ -30,45 +107,28 @@ def capture_commander_face():
     print("👉 按【Q】key退出")
     print("=" * 50)
     
+    # 采集放在后台线程，主线程只负责显示和按键（HighGUI 需要在主线程）
+    reader = _LatestFrameReader(cap)
+    last_frame = None
+    
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        ok, frame = reader.read()
+        if not ok:
             print("❌ 读取摄像头失败")
             break
         
-        # 画辅助对准框
-        height, width = frame.shape[:2]
-        center_x, center_y = width // 2, height // 2
-        
-        # 绿色矩形框
-        cv2.rectangle(
-            frame, 
-            (center_x - 150, center_y - 200), 
-            (center_x + 150, center_y + 200), 
-            (0, 255, 0), 2
-        )
-        
-        # 标签文字
-        cv2.putText(
-            frame, "Commander", 
-            (center_x - 70, center_y - 210), 
-            cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2
-        )
-        
-        # 操作提示
-        cv2.putText(
-            frame, "Press [S] to Save, [Q] to Quit", 
-            (10, height - 20), 
-            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2
-        )
-        
-        cv2.imshow('Register Face - Commander', frame)
+        # 有新帧才重画预览，没有就只处理按键
+        if frame is not None:
+            last_frame = frame
+            preview = frame.copy()
+            _draw_overlay(preview)
+            cv2.imshow('Register Face - Commander', preview)
         
         key = cv2.waitKey(1) & 0xFF
-        if key == ord('s') or key == ord('S'):
-            # 保存照片
+        if (key == ord('s') or key == ord('S')) and last_frame is not None:
+            # 保存照片（原始帧，不含辅助框）
             filename = face_db_dir / "commander.jpg"
-            cv2.imwrite(str(filename), frame)
+            cv2.imwrite(str(filename), last_frame)
             print(f"\n✅ 指挥官照片已保存至: {filename}")
             print("🎉 录入完成！鹰眼系统现在可以识别你了。")
             break
@@ -76,7 +136,7 @@ def capture_commander_face():
             print("\n⚠️ 已取消注册")
             break
     
-    cap.release()
+    reader.stop()
     cv2.destroyAllWindows()
 
 
@@ -0,0 +1,179 @@
+"""
+test_long_term_memory.py — 长期记忆（关键词检索）测试
+验证 MemorySystem 的 SQLite 存储：旧版 JSONL/JSON 迁移、重开后的读写与检索、迁移只做一次。
+"""
+import sys
+import json
+import sqlite3
+import pytest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+
+def _atom(mem_id, content, keywords, importance=1):
+    return {
+        "id": mem_id,
+        "date": "2025-01-01 12:00:00",
+        "content": content,
+        "keywords": keywords,
+        "importance": importance,
+    }
+
+
+@pytest.fixture
+def memory_module(tmp_path, monkeypatch):
+    """把数据库和旧版文件路径指向临时目录"""
+    from fuguang import memory
+    monkeypatch.setattr(memory, "LONG_TERM_MEMORY_DB", tmp_path / "long_term_memory.db")
+    monkeypatch.setattr(memory, "LONG_TERM_MEMORY_LOG", tmp_path / "long_term_memory.jsonl")
+    monkeypatch.setattr(memory, "LONG_TERM_MEMORY_FILE", tmp_path / "long_term_memory.json")
+    return memory
+
+
+def _open(memory_module):
+    return memory_module.MemorySystem()
+
+
+def _db_delete(memory_module, content):
+    """绕过 MemorySystem，直接从临时库删除一条记忆"""
+    conn = sqlite3.connect(memory_module.LONG_TERM_MEMORY_DB)
+    try:
+        with conn:
+            return conn.execute("DELETE FROM memories WHERE content = ?", (content,)).rowcount
+    finally:
+        conn.close()
+
+
+def _db_contents(memory_module):
+    conn = sqlite3.connect(memory_module.LONG_TERM_MEMORY_DB)
+    try:
+        return [row[0] for row in conn.execute("SELECT content FROM memories ORDER BY seq")]
+    finally:
+        conn.close()
+
+
+class TestLegacyMigration:
+    """测试旧版存储迁移到 SQLite"""
+
+    def test_migrate_from_jsonl(self, memory_module):
+        """JSONL 日志：按顺序导入，重复内容和损坏的行被跳过"""
+        lines = [
+            json.dumps(_atom(1, "阿鑫最喜欢的剧是风骚律师", ["喜欢", "风骚", "律师"], 5), ensure_ascii=False),
+            json.dumps(_atom(2, "阿鑫不喜欢吃蔬菜", ["喜欢", "蔬菜"], 3), ensure_ascii=False),
+            json.dumps(_atom(3, "阿鑫最喜欢的剧是风骚律师", ["风骚"]), ensure_ascii=False),
+            '{"id": 4, "content": "写到一半',
+        ]
+        memory_module.LONG_TERM_MEMORY_LOG.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        brain = _open(memory_module)
+        try:
+            assert [m["content"] for m in brain.memories] == ["阿鑫最喜欢的剧是风骚律师", "阿鑫不喜欢吃蔬菜"]
+            assert brain.memories[0]["keywords"] == ["喜欢", "风骚", "律师"]
+            assert brain.memories[0]["importance"] == 5
+        finally:
+            brain.close()
+        assert _db_contents(memory_module) == ["阿鑫最喜欢的剧是风骚律师", "阿鑫不喜欢吃蔬菜"]
+
+    def test_migrate_from_json(self, memory_module):
+        """整体 JSON 文件：没有 JSONL 日志时导入"""
+        legacy = [
+            _atom(1, "阿鑫正在开发Project Fuguang项目", ["开发", "项目"], 4),
+            _atom(2, "阿鑫不喜欢吃蔬菜", ["喜欢", "蔬菜"], 3),
+        ]
+        memory_module.LONG_TERM_MEMORY_FILE.write_text(
+            json.dumps(legacy, ensure_ascii=False), encoding="utf-8"
+        )
+
+        brain = _open(memory_module)
+        try:
+            assert [m["content"] for m in brain.memories] == [m["content"] for m in legacy]
+            assert brain.memories[0]["keywords"] == ["开发", "项目"]
+        finally:
+            brain.close()
+        assert _db_contents(memory_module) == [m["content"] for m in legacy]
+
+    def test_jsonl_preferred_over_json(self, memory_module):
+        """两种旧文件都在时以 JSONL 日志为准"""
+        memory_module.LONG_TERM_MEMORY_LOG.write_text(
+            json.dumps(_atom(1, "来自日志", ["日志"]), ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+        memory_module.LONG_TERM_MEMORY_FILE.write_text(
+            json.dumps([_atom(1, "来自整体文件", ["文件"])], ensure_ascii=False), encoding="utf-8"
+        )
+
+        brain = _open(memory_module)
+        try:
+            assert [m["content"] for m in brain.memories] == ["来自日志"]
+        finally:
+            brain.close()
+
+    def test_second_instance_does_not_remigrate(self, memory_module):
+        """迁移只做一次：旧文件之后的改动、以及删空后的库都不会再导入"""
+        legacy = memory_module.LONG_TERM_MEMORY_LOG
+        legacy.write_text(
+            json.dumps(_atom(1, "第一条", ["第一"]), ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+        first = _open(memory_module)
+        first.close()
+
+        with open(legacy, "a", encoding="utf-8") as f:
+            f.write(json.dumps(_atom(2, "迁移后才写进旧文件", ["之后"]), ensure_ascii=False) + "\n")
+        second = _open(memory_module)
+        try:
+            assert [m["content"] for m in second.memories] == ["第一条"]
+        finally:
+            second.close()
+        assert _db_delete(memory_module, "第一条") == 1
+
+        third = _open(memory_module)
+        try:
+            assert third.memories == []
+        finally:
+            third.close()
+        assert _db_contents(memory_module) == []
+
+    def test_no_legacy_files(self, memory_module):
+        """没有旧文件时得到空库"""
+        brain = _open(memory_module)
+        try:
+            assert brain.memories == []
+        finally:
+            brain.close()
+        assert memory_module.LONG_TERM_MEMORY_DB.exists()
+
+
+class TestRoundTrip:
+    """测试重开数据库后的读写与检索"""
+
+    def test_add_search_delete_after_reopen(self, memory_module):
+        """写入的记忆重开后仍可检索，从库里删除后重开不再出现"""
+        pytest.importorskip("jieba")
+
+        brain = _open(memory_module)
+        try:
+            brain.add_memory("阿鑫最喜欢的剧是风骚律师", importance=5)
+            brain.add_memory("阿鑫正在开发扶光项目", importance=4)
+            brain.add_memory("阿鑫最喜欢的剧是风骚律师", importance=5)  # 重复，跳过
+            assert len(brain.memories) == 2
+        finally:
+            brain.close()
+
+        reopened = _open(memory_module)
+        try:
+            assert [m["content"] for m in reopened.memories] == [
+                "阿鑫最喜欢的剧是风骚律师", "阿鑫正在开发扶光项目"
+            ]
+            assert "阿鑫最喜欢的剧是风骚律师" in reopened.search_memory("风骚律师好看吗")
+        finally:
+            reopened.close()
+        assert _db_delete(memory_module, "阿鑫最喜欢的剧是风骚律师") == 1
+
+        final = _open(memory_module)
+        try:
+            assert [m["content"] for m in final.memories] == ["阿鑫正在开发扶光项目"]
+            assert final.search_memory("风骚律师好看吗") == []
+            assert "阿鑫正在开发扶光项目" in final.search_memory("扶光项目进展")
+        finally:
+            final.close()
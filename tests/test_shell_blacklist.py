@@ -0,0 +1,110 @@
+"""
+test_shell_blacklist.py — Shell 命令黑名单测试
+验证 execute_shell_command 的预编译黑名单正则与原来逐个子串比较的结果一致。
+"""
+import sys
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+# 原实现的名单和判断逻辑（对照基准）
+BASELINE_FORBIDDEN = [
+    "format ", "mkfs", "dd if=", "> /dev/sda", "clear-disk", "format-volume", "shutdown",
+    "restart", "reboot", "poweroff", "reg delete hklm", "reg delete hkcr", ":(){ :|:& };:",
+    "%0|%0", "c:\\windows", "c:\\program files", "system32",
+]
+BASELINE_DELETE_KW = ["remove-item", "del ", "rm ", "rd ", "rmdir", "rm -r", "rm -f"]
+BASELINE_DANGER = [
+    "c:\\windows", "c:\\program files", "c:\\program files (x86)", "system32", "syswow64",
+    "$env:windir", "$env:systemroot", "\\appdata\\roaming\\microsoft",
+    "/etc", "/usr", "/bin", "/sbin", "/boot", "/var",
+]
+
+
+def baseline_check(command):
+    """原来的循环实现：返回拦截消息，放行返回 None"""
+    command_lower = command.lower()
+    for p in BASELINE_FORBIDDEN:
+        if p.lower() in command_lower:
+            return f"❌ [安全拦截] 命令包含高危操作 '{p}'，已拒绝执行。"
+    if any(kw in command_lower for kw in BASELINE_DELETE_KW):
+        if any(dp in command_lower for dp in BASELINE_DANGER):
+            return "❌ [安全拦截] 禁止删除系统关键目录！"
+    return None
+
+
+def _case_variants(text):
+    """原样 / 全大写 / 大小写交替"""
+    mixed = "".join(ch.upper() if i % 2 else ch.lower() for i, ch in enumerate(text))
+    return [text, text.upper(), mixed]
+
+
+FORBIDDEN_COMMANDS = [
+    cmd
+    for p in BASELINE_FORBIDDEN
+    for variant in _case_variants(p)
+    for cmd in (variant, f"echo start; {variant} now")
+]
+DELETE_COMMANDS = [
+    f"{kw_variant}{dir_variant}\\temp"
+    for kw in BASELINE_DELETE_KW
+    for dp in BASELINE_DANGER
+    for kw_variant, dir_variant in zip(_case_variants(kw), _case_variants(dp))
+]
+BENIGN_COMMANDS = [
+    "Get-ChildItem ~/Desktop",
+    "echo hello",
+    "rm ./build/output.txt",
+    "Remove-Item C:\\Users\\me\\Desktop\\old.txt",
+    "dir C:\\Users",
+    "python -m pip list",
+    "Get-Content notes.md | Select-Object -First 5",
+]
+
+
+@pytest.fixture
+def run_shell(mock_config, monkeypatch):
+    """调用 execute_shell_command；放行的命令不真正执行，只记录 subprocess.run 调用"""
+    from fuguang.core.skills import system
+    fake_run = MagicMock(return_value=SimpleNamespace(returncode=0, stdout=b"ok", stderr=b""))
+    monkeypatch.setattr(system.subprocess, "run", fake_run)
+    skills = SimpleNamespace(config=mock_config)
+
+    def run(command):
+        return system.SystemSkills.execute_shell_command(skills, command), fake_run
+
+    return run
+
+
+class TestShellBlacklist:
+    """黑名单正则与原循环实现逐条对照"""
+
+    @pytest.mark.parametrize("command", FORBIDDEN_COMMANDS)
+    def test_forbidden_rejected(self, run_shell, command):
+        """每个高危片段（含正则元字符、大小写混写）都被拦截，消息与原实现相同"""
+        expected = baseline_check(command)
+        assert expected is not None
+        result, fake_run = run_shell(command)
+        assert result == expected
+        fake_run.assert_not_called()
+
+    @pytest.mark.parametrize("command", DELETE_COMMANDS)
+    def test_delete_protected_dir_rejected(self, run_shell, command):
+        """删除类命令 + 系统关键目录被拦截，消息与原实现相同"""
+        expected = baseline_check(command)
+        assert expected is not None
+        result, fake_run = run_shell(command)
+        assert result == expected
+        fake_run.assert_not_called()
+
+    @pytest.mark.parametrize("command", BENIGN_COMMANDS)
+    def test_benign_allowed(self, run_shell, command):
+        """普通命令放行并真正调用 subprocess.run"""
+        assert baseline_check(command) is None
+        result, fake_run = run_shell(command)
+        assert "安全拦截" not in result
+        fake_run.assert_called_once()
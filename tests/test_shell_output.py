@@ -0,0 +1,92 @@
+"""
+test_shell_output.py — Shell 命令输出解码测试
+验证 _decode_output 只解码前缀时的 UTF-8 / 系统编码回退、截断判断和首尾空白处理。
+"""
+import sys
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+
+@pytest.fixture
+def system():
+    from fuguang.core.skills import system
+    return system
+
+
+class TestDecodeOutput:
+    """测试 _decode_output"""
+
+    def test_utf8_multibyte_split_at_limit(self, system):
+        """解码前缀截在多字节字符中间时，不产生乱码且判定为截断"""
+        limit = 10
+        # 每个"中"占 3 字节，(limit + 1) * 4 = 44 字节处正好切在字符中间
+        data = ("中" * 50).encode("utf-8")
+        assert len(data[:(limit + 1) * 4]) % 3 != 0
+        text, truncated = system._decode_output(data, limit)
+        assert text == "中" * limit
+        assert truncated
+
+    def test_gbk_falls_back_to_system_encoding(self, system, monkeypatch):
+        """不是合法 UTF-8 的输出按系统编码解码"""
+        monkeypatch.setattr(system, "_SYS_ENCODING", "gbk")
+        text, truncated = system._decode_output("找不到文件".encode("gbk"), 100)
+        assert text == "找不到文件"
+        assert not truncated
+
+    def test_gbk_fallback_truncated(self, system, monkeypatch):
+        """系统编码回退时同样按 limit 截断"""
+        monkeypatch.setattr(system, "_SYS_ENCODING", "gbk")
+        text, truncated = system._decode_output(("错误" * 50).encode("gbk"), 10)
+        assert text == "错误" * 5
+        assert truncated
+
+    def test_exactly_at_limit_not_truncated(self, system):
+        """正好 limit 个字符不算截断，多一个字符才算"""
+        text, truncated = system._decode_output(("中" * 10).encode("utf-8"), 10)
+        assert text == "中" * 10
+        assert not truncated
+
+        text, truncated = system._decode_output(("中" * 11).encode("utf-8"), 10)
+        assert text == "中" * 10
+        assert truncated
+
+    def test_surrounding_whitespace_not_counted(self, system):
+        """首尾空白先去掉，不计入 limit"""
+        text, truncated = system._decode_output(b"\r\n  " + b"a" * 10 + b"  \r\n\r\n", 10)
+        assert text == "a" * 10
+        assert not truncated
+
+    def test_truncated_text_rstripped(self, system):
+        """截断处落在空白上时，截断后的文本也去掉尾部空白"""
+        text, truncated = system._decode_output(b"line1   \n   \nline2", 8)
+        assert text == "line1"
+        assert truncated
+
+    def test_empty_output(self, system):
+        """只有空白的输出解码为空串"""
+        assert system._decode_output(b" \r\n\t", 10) == ("", False)
+
+
+class TestShellOutputFormat:
+    """测试 execute_shell_command 的输出拼接"""
+
+    def _run(self, system, mock_config, monkeypatch, stdout):
+        fake_run = MagicMock(return_value=SimpleNamespace(returncode=0, stdout=stdout, stderr=b""))
+        monkeypatch.setattr(system.subprocess, "run", fake_run)
+        return system.SystemSkills.execute_shell_command(SimpleNamespace(config=mock_config), "echo test")
+
+    def test_truncation_marker_follows_stripped_text(self, system, mock_config, monkeypatch):
+        """截断标记紧跟在去掉尾部空白的文本之后"""
+        result = self._run(system, mock_config, monkeypatch, b"x" * 1990 + b" " * 20 + b"y" * 100)
+        assert "【标准输出】:\n" + "x" * 1990 + "...(已截断)" in result
+
+    def test_exactly_at_limit_has_no_marker(self, system, mock_config, monkeypatch):
+        """正好 2000 个字符的输出不加截断标记"""
+        result = self._run(system, mock_config, monkeypatch, b"x" * 2000 + b"\r\n")
+        assert "x" * 2000 in result
+        assert "已截断" not in result
@@ -0,0 +1,44 @@
+"""
+test_voice_sentences.py — edge-tts 分句测试
+验证 _split_sentences：连续句末标点和右引号留在句尾，纯标点片段不单独成句。
+"""
+import sys
+import pytest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+
+@pytest.fixture
+def split():
+    from fuguang.voice import _split_sentences
+    return _split_sentences
+
+
+class TestSplitSentences:
+    """测试按句切分"""
+
+    def test_repeated_terminators_stay_together(self, split):
+        """连续叹号整体留在句尾"""
+        assert split("你好！！今天怎么样？") == ["你好！！", "今天怎么样？"]
+
+    def test_mixed_ascii_terminators(self, split):
+        """?! 不被拆成两句"""
+        assert split("真的吗?!") == ["真的吗?!"]
+
+    def test_closing_quote_stays_with_sentence(self, split):
+        """句末标点后的右引号留在本句，不挪到下一句"""
+        assert split("他说：“好的。”然后走了。") == ["他说：“好的。”", "然后走了。"]
+
+    def test_punctuation_only_piece_merged(self, split):
+        """纯标点片段并回上一句"""
+        assert split("好的。……") == ["好的。……"]
+
+    def test_decimal_not_split(self, split):
+        """英文句点后没有空白（小数）不切分"""
+        assert split("版本 3.14 发布了. Next one!") == ["版本 3.14 发布了.", "Next one!"]
+
+    def test_empty(self, split):
+        """空白文本不产生句子"""
+        assert split("  \n") == []